@@ -0,0 +1,71 @@
+import hmac
+from dataclasses import asdict
+from typing import Any, List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from pydantic import ValidationError
+from app.config import settings
+from app.models import ChangeFeed, ChangeResponse, WebhookChange
+from app.services.changes import change_log
+
+router = APIRouter()
+
+
+def _authorized(secret: Optional[str]) -> bool:
+    if not settings.webhook_secret or not secret:
+        return False
+    return hmac.compare_digest(secret.encode(), settings.webhook_secret.encode())
+
+
+async def _payload(request: Request) -> List[Any]:
+    if request.headers.get("content-type", "").startswith("application/json"):
+        body = await request.json()
+        if isinstance(body, dict) and "changes" in body:
+            body = body["changes"]
+        return body if isinstance(body, list) else [body]
+    return [dict(await request.form())]
+
+
+@router.post("/webhooks/retailcrm")
+async def receive_webhook(
+    request: Request,
+    secret: Optional[str] = Query(None, description="Shared webhook secret"),
+    x_webhook_secret: Optional[str] = Header(None, description="Shared webhook secret")
+):
+    if not settings.webhook_secret:
+        raise HTTPException(status_code=503, detail="Webhook receiver is not configured")
+    if not _authorized(x_webhook_secret or secret):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+    try:
+        changes = [WebhookChange.model_validate(item) for item in await _payload(request)]
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    accepted = sum(change_log.add(change.entity, change.id, change.customer_id) for change in changes)
+    return {
+        "success": True,
+        "received": len(changes),
+        "accepted": accepted
+    }
+
+
+@router.get("/changes", response_model=ChangeFeed)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Return changes after this sequence number"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes"),
+    wait: float = Query(0, ge=0, description="Seconds to wait for new changes (long-poll)")
+):
+    await change_log.wait(since, min(wait, settings.changes_max_wait))
+    changes, reset = change_log.since(since, limit)
+
+    if changes:
+        next_since = changes[-1].seq
+    else:
+        next_since = change_log.last_seq if reset else since
+
+    return ChangeFeed(
+        changes=[ChangeResponse(**asdict(change)) for change in changes],
+        last_seq=change_log.last_seq,
+        next_since=next_since,
+        reset=reset
+    )
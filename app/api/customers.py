@@ -1,14 +1,63 @@
+import csv
+import io
+import json
 import httpx
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
+from fastapi import APIRouter, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional, List
 from datetime import datetime
-from app.models import CustomerFilter, CustomerCreate, CustomerResponse
-from app.services.retailcrm import retailcrm_service
+from app.models import CustomerFilter, CustomerCreate, CustomerPage, CustomerResponse, CustomerSearchResult
+from app.services.bulk import import_customers, spool
+from app.services.jsonstream import iter_json_records
+from app.services.mappers import (
+    customer_to_retailcrm, error_detail, format_datetime, map_customer, parse_fields, select_fields
+)
+from app.services.pagination import decode_cursor, page_envelope
+from app.services.retailcrm import RetailCRMError, retailcrm_service
+from app.services.search import search_indexer
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
 
-@router.get("/customers", response_model=List[CustomerResponse])
+
+def _csv_line(values: List[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+async def _chain(first: Dict[str, Any], rest: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    yield first
+    async for item in rest:
+        yield item
+
+
+async def _export_rows(
+    first: Optional[Dict[str, Any]],
+    customers: AsyncIterator[Dict[str, Any]],
+    format: str
+) -> AsyncIterator[str]:
+    columns = list(CustomerResponse.model_fields)
+    try:
+        if format == "csv":
+            yield _csv_line(columns)
+        if first is None:
+            return
+        
+        async for row in _chain(first, customers):
+            if format == "csv":
+                yield _csv_line([row[column] for column in columns])
+            else:
+                yield json.dumps(row, ensure_ascii=False) + "\n"
+    finally:
+        await customers.aclose()
+
+
+@router.get("/customers", response_model=CustomerPage)
 async def get_customers(
     first_name: Optional[str] = Query(None, description="Filter by first name"),
     last_name: Optional[str] = Query(None, description="Filter by last name"),
@@ -16,67 +65,121 @@ async def get_customers(
     created_at_from: Optional[datetime] = Query(None, description="Filter by creation date from"),
     created_at_to: Optional[datetime] = Query(None, description="Filter by creation date to"),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=20, le=100, description="Items per page (20, 50, or 100)")
+    limit: int = Query(20, ge=20, le=100, description="Items per page (20, 50, or 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response; overrides filters and page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. first_name,email")
 ):
+    params = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "created_at_from": format_datetime(created_at_from),
+        "created_at_to": format_datetime(created_at_to),
+        "page": page,
+        "limit": limit
+    }
     try:
-        if limit not in [20, 50, 100]:
-            limit = 20
-        
-        created_from_str = created_at_from.strftime("%Y-%m-%d %H:%M:%S") if created_at_from else None
-        created_to_str = created_at_to.strftime("%Y-%m-%d %H:%M:%S") if created_at_to else None
+        selected = parse_fields(fields, CustomerResponse.model_fields)
+        if cursor:
+            params = decode_cursor(cursor, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        if params["limit"] not in [20, 50, 100]:
+            params["limit"] = 20
         
-        result = await retailcrm_service.get_customers(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            created_at_from=created_from_str,
-            created_at_to=created_to_str,
-            page=page,
-            limit=limit
-        )
+        result = await retailcrm_service.get_customers(**params, transform=map_customer)
         
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("errorMsg", "Failed to fetch customers"))
         
-        customers = result.get("customers", [])
-        return [
-            CustomerResponse(
-                id=customer["id"],
-                first_name=customer.get("firstName"),
-                last_name=customer.get("lastName"),
-                email=customer.get("email"),
-                phone=customer.get("phones", [{}])[0].get("number") if customer.get("phones") else None,
-                created_at=customer.get("createdAt")
-            )
-            for customer in customers
-        ]
+        customers = [select_fields(customer, selected) for customer in result.get("customers", [])]
+        return ORJSONResponse(page_envelope(result, customers, params))
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/customers/export")
+async def export_customers(
+    first_name: Optional[str] = Query(None, description="Filter by first name"),
+    last_name: Optional[str] = Query(None, description="Filter by last name"),
+    email: Optional[str] = Query(None, description="Filter by email"),
+    created_at_from: Optional[datetime] = Query(None, description="Filter by creation date from"),
+    created_at_to: Optional[datetime] = Query(None, description="Filter by creation date to"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format (ndjson or csv)")
+):
+    customers = retailcrm_service.iter_customers(
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+        created_at_from=format_datetime(created_at_from),
+        created_at_to=format_datetime(created_at_to),
+        transform=map_customer
+    )
+    
+    try:
+        first = await anext(customers, None)
+    except RetailCRMError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    return StreamingResponse(
+        _export_rows(first, customers, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="customers.{format}"'}
+    )
+
+
+@router.get("/customers/search", response_model=List[CustomerSearchResult])
+async def search_customers(
+    q: str = Query(..., min_length=1, description="Name, email or phone fragment"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of results")
+):
+    if not search_indexer.ready:
+        raise HTTPException(status_code=503, detail="Search index is not ready")
+    
+    return [CustomerSearchResult(score=score, **customer) for score, customer in search_indexer.search(q, limit)]
+
+
+@router.post("/customers/bulk")
+async def create_customers_bulk(
+    file: UploadFile = File(..., description="JSON array or NDJSON of customers"),
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Customers created in parallel"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: rows derive per-row keys from it, so a re-run returns rows created earlier instead of duplicating them. Stored as the entity externalId unless one is given")
+):
+    spooled = await spool(file.read)
+    
+    async def read(size: int) -> bytes:
+        return spooled.read(size)
+    
+    async def report() -> AsyncIterator[str]:
+        try:
+            async for record in import_customers(iter_json_records(read), concurrency, idempotency_key):
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        except ValueError as e:
+            yield json.dumps({"error": f"Invalid upload: {e}"}, ensure_ascii=False) + "\n"
+        finally:
+            spooled.close()
+    
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
 @router.post("/customers", response_model=dict)
-async def create_customer(customer: CustomerCreate):
+async def create_customer(
+    customer: CustomerCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: a repeated create with the same key returns the entity created by the first attempt. Stored as the entity externalId unless one is given")
+):
     try:
-        customer_data = {}
-        
-        if customer.first_name:
-            customer_data["firstName"] = customer.first_name
-        if customer.last_name:
-            customer_data["lastName"] = customer.last_name
-        if customer.email:
-            customer_data["email"] = customer.email
-        if customer.phone:
-            customer_data["phones"] = [{"number": customer.phone}]
+        customer_data = customer_to_retailcrm(customer)
         
-        result = await retailcrm_service.create_customer(customer_data)
+        result = await retailcrm_service.create_customer(customer_data, idempotency_key=idempotency_key)
         
         if not result.get("success"):
-            error_msg = result.get("errorMsg", "Failed to create customer")
-            errors = result.get("errors", {})
-            detail = f"{error_msg}. Errors: {errors}" if errors else error_msg
-            raise HTTPException(status_code=400, detail=detail)
+            raise HTTPException(status_code=400, detail=error_detail(result, "Failed to create customer"))
         
         return {
             "success": True,
@@ -0,0 +1,99 @@
+import os
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, File, Header, HTTPException, Path, Query, UploadFile
+from fastapi.responses import FileResponse
+from app.models import JobResponse, OrderExportRequest
+from app.services.bulk import CHUNK_SIZE
+from app.services.jobs import Job, job_manager
+from app.services.mappers import format_datetime
+
+router = APIRouter()
+
+
+async def _submit_upload(kind: str, file: UploadFile, params: dict) -> JobResponse:
+    job = Job(kind=kind, params=params)
+    with open(job.input_path, "wb") as upload:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            upload.write(chunk)
+    await job_manager.submit(kind, job=job)
+    return JobResponse(**job_manager.to_dict(job))
+
+
+@router.post("/jobs/customers/export", response_model=JobResponse, status_code=202)
+async def submit_customers_export(
+    first_name: Optional[str] = Query(None, description="Filter by first name"),
+    last_name: Optional[str] = Query(None, description="Filter by last name"),
+    email: Optional[str] = Query(None, description="Filter by email"),
+    created_at_from: Optional[datetime] = Query(None, description="Filter by creation date from"),
+    created_at_to: Optional[datetime] = Query(None, description="Filter by creation date to")
+):
+    params = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "created_at_from": format_datetime(created_at_from),
+        "created_at_to": format_datetime(created_at_to)
+    }
+    job = await job_manager.submit("customers_export", params)
+    return JobResponse(**job_manager.to_dict(job))
+
+
+@router.post("/jobs/orders/export", response_model=JobResponse, status_code=202)
+async def submit_orders_export(
+    request: OrderExportRequest,
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Customers processed in parallel")
+):
+    job = await job_manager.submit("orders_export", {"customer_ids": request.customer_ids, "concurrency": concurrency})
+    return JobResponse(**job_manager.to_dict(job))
+
+
+@router.post("/jobs/orders/export/upload", response_model=JobResponse, status_code=202)
+async def submit_orders_export_upload(
+    file: UploadFile = File(..., description="Customer IDs, one per line or comma separated"),
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Customers processed in parallel")
+):
+    return await _submit_upload("orders_export", file, {"concurrency": concurrency})
+
+
+@router.post("/jobs/customers/import", response_model=JobResponse, status_code=202)
+async def submit_customers_import(
+    file: UploadFile = File(..., description="JSON array or NDJSON of customers"),
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Customers created in parallel"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: rows derive per-row keys from it, so a re-run returns rows created earlier instead of duplicating them. Stored as the entity externalId unless one is given")
+):
+    return await _submit_upload(
+        "customers_import", file, {"concurrency": concurrency, "idempotency_key": idempotency_key}
+    )
+
+
+@router.post("/jobs/orders/import", response_model=JobResponse, status_code=202)
+async def submit_orders_import(
+    file: UploadFile = File(..., description="JSON array or NDJSON of orders with their payments"),
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Orders created in parallel"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: rows derive per-row keys from it, so a re-run returns rows created earlier instead of duplicating them. Stored as the entity externalId unless one is given")
+):
+    return await _submit_upload(
+        "orders_import", file, {"concurrency": concurrency, "idempotency_key": idempotency_key}
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str = Path(..., description="Job ID")):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job_manager.to_dict(job))
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str = Path(..., description="Job ID")):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not os.path.exists(job.result_path):
+        raise HTTPException(status_code=404, detail="Job has no result yet")
+    return FileResponse(job.result_path, media_type="application/x-ndjson", filename=f"{job.kind}-{job.id}.ndjson")
@@ -1,68 +1,117 @@
-from fastapi import APIRouter, HTTPException, Path, Query
-from typing import List
+from fastapi import APIRouter, File, Header, HTTPException, Path, Query, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, List, Optional
+import json
 import httpx
-from app.models import OrderCreate, OrderResponse, PaymentCreate, PaymentResponse
+from app.models import OrderCreate, OrderExportRequest, OrderPage, OrderResponse, PaymentCreate, PaymentResponse
+from app.services.bulk import export_customer_orders, import_orders, iter_spooled_lines, spool
+from app.services.jsonstream import iter_json_records
+from app.services.mappers import map_order, order_to_retailcrm, parse_fields, payment_to_retailcrm, select_fields
+from app.services.pagination import decode_cursor, page_envelope
 from app.services.retailcrm import retailcrm_service
 
 router = APIRouter()
 
 
-@router.get("/customers/{customer_id}/orders", response_model=List[OrderResponse])
+async def _ndjson(records: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+async def _split_ids(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    async for line in lines:
+        for value in line.replace(",", " ").split():
+            yield value
+
+
+@router.get("/customers/{customer_id}/orders", response_model=OrderPage)
 async def get_customer_orders(
     customer_id: int = Path(..., description="Customer ID"),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=20, le=100, description="Items per page (20, 50, or 100)")
+    limit: int = Query(20, ge=20, le=100, description="Items per page (20, 50, or 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response; overrides page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. number,status")
 ):
+    params = {"page": page, "limit": limit}
+    try:
+        selected = parse_fields(fields, OrderResponse.model_fields)
+        if cursor:
+            params = decode_cursor(cursor, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        if limit not in [20, 50, 100]:
-            limit = 20
+        if params["limit"] not in [20, 50, 100]:
+            params["limit"] = 20
         
-        result = await retailcrm_service.get_orders(
-            customer_id=customer_id,
-            page=page,
-            limit=limit
-        )
+        result = await retailcrm_service.get_orders(customer_id=customer_id, **params, transform=map_order)
         
         if not result.get("success"):
             raise HTTPException(status_code=400, detail="Failed to fetch orders")
         
-        orders = result.get("orders", [])
-        return [
-            OrderResponse(
-                id=order["id"],
-                number=order.get("number"),
-                customer_id=order.get("customer", {}).get("id"),
-                created_at=order.get("createdAt"),
-                status=order.get("status"),
-                total_sum=order.get("totalSumm")
-            )
-            for order in orders
-        ]
+        orders = [select_fields(order, selected) for order in result.get("orders", [])]
+        return ORJSONResponse(page_envelope(result, orders, params))
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/orders/export")
+async def export_orders(
+    request: OrderExportRequest,
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Customers processed in parallel")
+):
+    return StreamingResponse(
+        _ndjson(export_customer_orders(request.customer_ids, concurrency)),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/orders/export/upload")
+async def export_orders_upload(
+    file: UploadFile = File(..., description="Customer IDs, one per line or comma separated"),
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Customers processed in parallel")
+):
+    customer_ids = _split_ids(iter_spooled_lines(await spool(file.read)))
+    return StreamingResponse(
+        _ndjson(export_customer_orders(customer_ids, concurrency)),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/orders/bulk")
+async def create_orders_bulk(
+    file: UploadFile = File(..., description="JSON array or NDJSON of orders with their payments"),
+    concurrency: Optional[int] = Query(None, ge=1, le=50, description="Orders created in parallel"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: rows derive per-row keys from it, so a re-run returns rows created earlier instead of duplicating them. Stored as the entity externalId unless one is given")
+):
+    spooled = await spool(file.read)
+    
+    async def read(size: int) -> bytes:
+        return spooled.read(size)
+    
+    async def report() -> AsyncIterator[str]:
+        try:
+            async for record in import_orders(iter_json_records(read), concurrency, idempotency_key):
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        except ValueError as e:
+            yield json.dumps({"error": f"Invalid upload: {e}"}, ensure_ascii=False) + "\n"
+        finally:
+            spooled.close()
+    
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
 @router.post("/orders", response_model=dict)
-async def create_order(order: OrderCreate):
+async def create_order(
+    order: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: a repeated create with the same key returns the entity created by the first attempt. Stored as the entity externalId unless one is given")
+):
     try:
-        order_data = {
-            "customer": {"id": order.customer_id},
-            "items": []
-        }
-        
-        if order.number:
-            order_data["number"] = order.number
+        order_data = order_to_retailcrm(order)
         
-        for item in order.items:
-            order_data["items"].append({
-                "productName": item.product_name,
-                "quantity": item.quantity,
-                "initialPrice": item.price
-            })
-        
-        result = await retailcrm_service.create_order(order_data)
+        result = await retailcrm_service.create_order(order_data, idempotency_key=idempotency_key)
         
         if not result.get("success"):
             raise HTTPException(
@@ -84,16 +133,13 @@ async def create_order(order: OrderCreate):
 @router.post("/orders/{order_id}/payment", response_model=dict)
 async def create_order_payment(
     order_id: int = Path(..., description="Order ID"),
-    payment: PaymentCreate = None
+    payment: PaymentCreate = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Retry key: a repeated create with the same key returns the entity created by the first attempt. Stored as the entity externalId unless one is given")
 ):
     try:
-        payment_data = {
-            "type": payment.type,
-            "status": payment.status,
-            "amount": payment.amount
-        }
+        payment_data = payment_to_retailcrm(payment)
         
-        result = await retailcrm_service.create_payment(order_id, payment_data)
+        result = await retailcrm_service.create_payment(order_id, payment_data, idempotency_key=idempotency_key)
         
         if not result.get("success"):
             raise HTTPException(
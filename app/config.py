@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +8,53 @@ class Settings(BaseSettings):
     app_host: str = "0.0.0.0"
     app_port: int = 8000
     debug: bool = True
+    log_sample_rate: float = 1.0
+    retailcrm_timeout: float = 30.0
+    retailcrm_http2: bool = False
+    retailcrm_max_connections: int = 100
+    retailcrm_max_keepalive_connections: int = 20
+    retailcrm_keepalive_expiry: float = 30.0
+    retailcrm_rate_limit: float = 10.0
+    retailcrm_rate_burst: int = 10
+    retailcrm_initial_concurrency: int = 10
+    retailcrm_min_concurrency: int = 1
+    retailcrm_max_concurrency: int = 20
+    retailcrm_retry_attempts: int = 3
+    retailcrm_retry_base_delay: float = 0.2
+    retailcrm_retry_max_delay: float = 5.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    export_prefetch_pages: int = 4
+    bulk_concurrency: int = 8
+    upload_spool_max_size: int = 1048576
+    jobs_workers: int = 2
+    jobs_dir: str = "data/jobs"
+    jobs_db_path: Optional[str] = None
+    jobs_progress_interval: float = 1.0
+    jobs_retention: float = 86400.0
+    mirror_enabled: bool = False
+    mirror_db_path: str = "data/mirror.db"
+    mirror_sync_interval: float = 60.0
+    read_mode: str = "live"
+    cache_enabled: bool = True
+    cache_ttl: float = 30.0
+    cache_maxsize: int = 1024
+    search_enabled: bool = False
+    search_refresh_interval: float = 300.0
+    webhook_secret: Optional[str] = None
+    changes_batch_interval: float = 0.5
+    changes_max_entries: int = 10000
+    changes_max_wait: float = 30.0
+    gzip_enabled: bool = True
+    gzip_minimum_size: int = 1000
+    metrics_enabled: bool = True
+    health_probe_ttl: float = 10.0
+    health_probe_timeout: float = 2.0
+    health_pool_saturation: float = 0.9
+    tracing_enabled: bool = False
+    tracing_service_name: str = "retailcrm-api"
+    tracing_otlp_endpoint: Optional[str] = None
+    tracing_file: Optional[str] = None
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,85 @@
+import json
+import logging
+import queue
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+from app.config import settings
+
+SECRET_KEYS = ("apikey", "api_key", "token", "secret", "password", "authorization")
+REDACTED = "***"
+
+_SECRET_PATTERN = re.compile(r"((?:apiKey|api_key|token|secret|password)=)[^&\s]+", re.IGNORECASE)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if any(secret in str(key).lower() for secret in SECRET_KEYS) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return _SECRET_PATTERN.sub(rf"\1{REDACTED}", value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage())
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = redact(value)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._counts: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        endpoint = getattr(record, "endpoint", None)
+        if endpoint is None or record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        if self.rate <= 0:
+            return False
+
+        count = self._counts.get(endpoint, 0) + 1
+        self._counts[endpoint] = count
+        return int(count * self.rate) != int((count - 1) * self.rate)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> QueueListener:
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter(settings.log_sample_rate))
+
+    logger = logging.getLogger("app")
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    logger.propagate = False
+
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
+
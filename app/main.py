@@ -1,16 +1,91 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from app.compression import StreamingGZipMiddleware
 from app.config import settings
-from app.api import customers, orders
+from app.logging_config import setup_logging
+from app.tracing import setup_tracing, shutdown_tracing
+from app.api import changes, customers, jobs, orders
+from app.services.changes import change_log
+from app.services.jobs import job_manager
+from app.services.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS, RetailCRMCollector
+from app.services.mirror import mirror_store, mirror_sync
+from app.services.resilience import CircuitBreaker
+from app.services.retailcrm import retailcrm_service
+from app.services.search import search_indexer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener = setup_logging()
+    await retailcrm_service.start()
+    await job_manager.start()
+    await change_log.start()
+    if settings.mirror_enabled:
+        await mirror_store.open()
+        await mirror_sync.start()
+        if settings.read_mode == "mirror":
+            retailcrm_service.mirror = mirror_store
+    if settings.search_enabled:
+        await search_indexer.start()
+    try:
+        yield
+    finally:
+        if settings.search_enabled:
+            await search_indexer.stop()
+        if settings.mirror_enabled:
+            retailcrm_service.mirror = None
+            await mirror_sync.stop()
+            await mirror_store.close()
+        await change_log.stop()
+        await job_manager.stop()
+        await retailcrm_service.close()
+        shutdown_tracing()
+        log_listener.stop()
+
 
 app = FastAPI(
     title="RetailCRM",
     description="FastAPI application for RetailCRM integration",
     version="1.0.0",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
+if settings.gzip_enabled:
+    app.add_middleware(StreamingGZipMiddleware, minimum_size=settings.gzip_minimum_size)
+
+if settings.metrics_enabled:
+    REGISTRY.register(RetailCRMCollector(retailcrm_service))
+
+    @app.middleware("http")
+    async def record_metrics(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        HTTP_IN_FLIGHT.inc()
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = request.scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUESTS.labels(request.method, path, str(status)).inc()
+            HTTP_LATENCY.labels(request.method, path).observe(time.perf_counter() - started)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+setup_tracing(app)
+
 app.include_router(customers.router, prefix="/api/v1", tags=["Customers"])
 app.include_router(orders.router, prefix="/api/v1", tags=["Orders"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
+app.include_router(changes.router, prefix="/api/v1", tags=["Changes"])
 
 
 @app.get("/")
@@ -24,4 +99,64 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    breaker = retailcrm_service.breaker.snapshot()
+    result = {
+        "status": "healthy" if breaker["state"] == CircuitBreaker.CLOSED else "degraded",
+        "retailcrm": {"circuit_breaker": breaker}
+    }
+    if settings.mirror_enabled:
+        result["mirror"] = {
+            "ready": mirror_store.ready,
+            "serving_reads": retailcrm_service.mirror is not None,
+            "last_sync": mirror_sync.last_sync,
+            "last_error": mirror_sync.last_error
+        }
+    if settings.search_enabled:
+        result["search"] = {
+            "ready": search_indexer.ready,
+            "size": len(search_indexer.index) if search_indexer.index is not None else 0,
+            "last_error": search_indexer.last_error
+        }
+    return result
+
+
+@app.get("/health/live")
+async def health_live():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    breaker = retailcrm_service.breaker.snapshot()
+    probe = await retailcrm_service.probe()
+    pool = retailcrm_service.pool_stats()
+    pool["saturation"] = round(pool["active"] / pool["max"], 3) if pool["max"] else 0.0
+    concurrency = {
+        "limit": retailcrm_service.concurrency.limit,
+        "in_flight": retailcrm_service.concurrency.in_flight
+    }
+    
+    upstream_ok = probe["ok"] and breaker["state"] != CircuitBreaker.OPEN
+    serving_mirror = retailcrm_service.mirror is not None and mirror_store.ready
+    saturated = pool["saturation"] >= settings.health_pool_saturation
+    ready = (upstream_ok or serving_mirror) and not saturated
+    
+    if not ready:
+        status = "not_ready"
+    elif not upstream_ok:
+        status = "degraded"
+    else:
+        status = "ready"
+    
+    result = {
+        "status": status,
+        "retailcrm": {
+            "probe": probe,
+            "circuit_breaker": breaker,
+            "pool": pool,
+            "concurrency": concurrency
+        }
+    }
+    if settings.mirror_enabled:
+        result["mirror"] = {"ready": mirror_store.ready, "serving_reads": serving_mirror}
+    return JSONResponse(result, status_code=200 if ready else 503)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -27,6 +27,23 @@ class CustomerResponse(BaseModel):
     created_at: Optional[str] = None
 
 
+class CustomerSearchResult(CustomerResponse):
+    score: float
+
+
+class PageMeta(BaseModel):
+    total_count: int
+    total_pages: int
+    page: int
+    limit: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class CustomerPage(PageMeta):
+    items: List[CustomerResponse]
+
+
 class OrderItem(BaseModel):
     product_name: str
     quantity: int = Field(gt=0)
@@ -39,6 +56,10 @@ class OrderCreate(BaseModel):
     number: Optional[str] = None
 
 
+class OrderExportRequest(BaseModel):
+    customer_ids: List[int] = Field(min_length=1)
+
+
 class OrderResponse(BaseModel):
     id: int
     number: Optional[str] = None
@@ -48,15 +69,57 @@ class OrderResponse(BaseModel):
     total_sum: Optional[float] = None
 
 
+class OrderPage(PageMeta):
+    items: List[OrderResponse]
+
+
 class PaymentCreate(BaseModel):
     amount: float = Field(gt=0)
     type: Optional[str] = "cash"
     status: Optional[str] = "paid"
 
 
+class OrderWithPayments(OrderCreate):
+    payments: List[PaymentCreate] = []
+
+
 class PaymentResponse(BaseModel):
     id: int
     order_id: int
     amount: float
     type: Optional[str] = None
-    status: Optional[str] = None
\ No newline at end of file
+    status: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result_url: Optional[str] = None
+
+
+class WebhookChange(BaseModel):
+    entity: str = Field(pattern="^(customer|order)$")
+    id: int
+    customer_id: Optional[int] = None
+
+
+class ChangeResponse(BaseModel):
+    seq: int
+    entity: str
+    id: int
+    customer_id: Optional[int] = None
+    received_at: str
+
+
+class ChangeFeed(BaseModel):
+    changes: List[ChangeResponse]
+    last_seq: int
+    next_since: int
+    reset: bool = False
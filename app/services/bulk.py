@@ -0,0 +1,245 @@
+import asyncio
+import tempfile
+import httpx
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+from pydantic import ValidationError
+from app.config import settings
+from app.models import CustomerCreate, OrderWithPayments
+from app.services.mappers import customer_to_retailcrm, error_detail, map_order, order_to_retailcrm, payment_to_retailcrm
+from app.services.retailcrm import RetailCRMError, retailcrm_service
+
+_DONE = object()
+CHUNK_SIZE = 65536
+
+
+async def aiter_items(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def spool(read: Callable[[int], Awaitable[bytes]]) -> tempfile.SpooledTemporaryFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.upload_spool_max_size)
+    while True:
+        chunk = await read(CHUNK_SIZE)
+        if not chunk:
+            break
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+async def iter_spooled_lines(spooled: tempfile.SpooledTemporaryFile) -> AsyncIterator[str]:
+    async def read(size: int) -> bytes:
+        return spooled.read(size)
+
+    try:
+        async for line in iter_lines(read):
+            yield line
+    finally:
+        spooled.close()
+
+
+async def iter_lines(read: Callable[[int], Awaitable[bytes]], chunk_size: int = CHUNK_SIZE) -> AsyncIterator[str]:
+    buffer = b""
+    while True:
+        chunk = await read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line.decode("utf-8").strip()
+    if buffer.strip():
+        yield buffer.decode("utf-8").strip()
+
+
+async def bounded_map(
+    items: Union[Iterable[Any], AsyncIterable[Any]],
+    worker: Callable[[Any], Awaitable[Any]],
+    concurrency: Optional[int] = None
+) -> AsyncIterator[Any]:
+    concurrency = max(1, concurrency or settings.bulk_concurrency)
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    async def produce() -> None:
+        async for item in aiter_items(items):
+            await inbox.put(item)
+        for _ in range(concurrency):
+            await inbox.put(_DONE)
+
+    async def consume() -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            await outbox.put(("result", await worker(item)))
+
+    async def run() -> None:
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(produce())
+                for _ in range(concurrency):
+                    group.create_task(consume())
+        except ExceptionGroup as e:
+            await outbox.put(("error", e.exceptions[0]))
+        else:
+            await outbox.put(("done", None))
+
+    runner = asyncio.ensure_future(run())
+    try:
+        while True:
+            kind, value = await outbox.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        runner.cancel()
+
+
+async def export_customer_orders(
+    customer_ids: Union[Iterable[Any], AsyncIterable[Any]],
+    concurrency: Optional[int] = None
+) -> AsyncIterator[dict]:
+    async def export_one(customer_id: Any) -> dict:
+        try:
+            customer_id = int(customer_id)
+        except (TypeError, ValueError):
+            return {"customer_id": customer_id, "error": "Invalid customer ID"}
+        
+        try:
+            orders = [order async for order in retailcrm_service.iter_orders(customer_id=customer_id, transform=map_order)]
+        except (RetailCRMError, httpx.HTTPError) as e:
+            return {"customer_id": customer_id, "error": str(e)}
+        return {"customer_id": customer_id, "orders": orders}
+
+    async for result in bounded_map(customer_ids, export_one, concurrency):
+        yield result
+
+
+async def _enumerate(records: AsyncIterable[Any], start: int = 1) -> AsyncIterator[Any]:
+    index = start
+    async for record in records:
+        yield index, record
+        index += 1
+
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors()
+    )
+
+
+async def import_customers(
+    records: AsyncIterable[Any],
+    concurrency: Optional[int] = None,
+    idempotency_key: Optional[str] = None
+) -> AsyncIterator[dict]:
+    created = 0
+    failed = 0
+
+    async def import_one(row: Any) -> dict:
+        index, record = row
+        if isinstance(record, ValueError):
+            return {"row": index, "success": False, "error": f"Invalid JSON: {record}"}
+        
+        try:
+            customer = CustomerCreate.model_validate(record)
+        except ValidationError as e:
+            return {"row": index, "success": False, "error": _validation_error(e)}
+        
+        try:
+            result = await retailcrm_service.create_customer(
+                customer_to_retailcrm(customer),
+                idempotency_key=f"{idempotency_key}-{index}" if idempotency_key else None
+            )
+        except httpx.HTTPError as e:
+            return {"row": index, "success": False, "error": str(e)}
+        
+        if not result.get("success"):
+            return {"row": index, "success": False, "error": error_detail(result, "Failed to create customer")}
+        return {"row": index, "success": True, "id": result.get("id")}
+
+    async for result in bounded_map(_enumerate(records), import_one, concurrency):
+        if result["success"]:
+            created += 1
+        else:
+            failed += 1
+        yield result
+
+    yield {"summary": {"total": created + failed, "created": created, "failed": failed}}
+
+
+async def import_orders(
+    records: AsyncIterable[Any],
+    concurrency: Optional[int] = None,
+    idempotency_key: Optional[str] = None
+) -> AsyncIterator[dict]:
+    progress = {"processed": 0, "orders_created": 0, "orders_failed": 0, "payments_created": 0, "payments_failed": 0}
+
+    async def create_payments(index: int, order_id: int, order: OrderWithPayments) -> list:
+        payments = []
+        for number, payment in enumerate(order.payments, start=1):
+            try:
+                result = await retailcrm_service.create_payment(
+                    order_id,
+                    payment_to_retailcrm(payment),
+                    idempotency_key=f"{idempotency_key}-{index}-{number}" if idempotency_key else None
+                )
+            except httpx.HTTPError as e:
+                result = {"success": False, "errorMsg": str(e)}
+            
+            if result.get("success"):
+                payments.append({"success": True, "id": result.get("id")})
+            else:
+                payments.append({"success": False, "error": error_detail(result, "Failed to create payment")})
+        return payments
+
+    async def import_one(row: Any) -> dict:
+        index, record = row
+        if isinstance(record, ValueError):
+            return {"row": index, "success": False, "error": f"Invalid JSON: {record}"}
+        
+        try:
+            order = OrderWithPayments.model_validate(record)
+        except ValidationError as e:
+            return {"row": index, "success": False, "error": _validation_error(e)}
+        
+        try:
+            result = await retailcrm_service.create_order(
+                order_to_retailcrm(order),
+                idempotency_key=f"{idempotency_key}-{index}" if idempotency_key else None
+            )
+        except httpx.HTTPError as e:
+            return {"row": index, "success": False, "error": str(e)}
+        
+        if not result.get("success"):
+            return {"row": index, "success": False, "error": error_detail(result, "Failed to create order")}
+        
+        order_id = result.get("id")
+        return {
+            "row": index,
+            "success": True,
+            "id": order_id,
+            "payments": await create_payments(index, order_id, order)
+        }
+
+    async for result in bounded_map(_enumerate(records), import_one, concurrency):
+        progress["processed"] += 1
+        if result["success"]:
+            progress["orders_created"] += 1
+            for payment in result["payments"]:
+                progress["payments_created" if payment["success"] else "payments_failed"] += 1
+        else:
+            progress["orders_failed"] += 1
+        yield {**result, "processed": progress["processed"]}
+
+    yield {"summary": progress}
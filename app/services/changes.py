@@ -0,0 +1,111 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.retailcrm import retailcrm_service
+
+ENTITIES = ("customer", "order")
+
+
+@dataclass
+class Change:
+    seq: int
+    entity: str
+    id: int
+    customer_id: Optional[int]
+    received_at: str
+
+
+class ChangeLog:
+    def __init__(self, max_entries: int = 10000, batch_interval: float = 0.5):
+        self.batch_interval = batch_interval
+        self.entries: Deque[Change] = deque(maxlen=max_entries)
+        self.last_seq = 0
+        self.received = 0
+        self.duplicates = 0
+        self._pending: Dict[Tuple[str, int], Optional[int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Condition] = None
+
+    async def start(self) -> None:
+        self._wake = asyncio.Event()
+        self._changed = asyncio.Condition()
+        retailcrm_service.write_listeners.append(self.record_write)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.record_write in retailcrm_service.write_listeners:
+            retailcrm_service.write_listeners.remove(self.record_write)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def add(self, entity: str, entity_id: int, customer_id: Optional[int] = None) -> bool:
+        if entity not in ENTITIES:
+            raise ValueError(f"Unknown entity: {entity}")
+
+        self.received += 1
+        key = (entity, entity_id)
+        if key in self._pending:
+            self.duplicates += 1
+            if customer_id is not None:
+                self._pending[key] = customer_id
+            return False
+
+        self._pending[key] = customer_id
+        if self._wake is not None:
+            self._wake.set()
+        return True
+
+    def record_write(self, entity: str, entity_id: Optional[int] = None, customer_id: Optional[int] = None) -> None:
+        if entity_id is not None:
+            self.add(entity, entity_id, customer_id)
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        received_at = datetime.now(timezone.utc).isoformat()
+        for (entity, entity_id), customer_id in pending.items():
+            self.last_seq += 1
+            self.entries.append(Change(self.last_seq, entity, entity_id, customer_id, received_at))
+            retailcrm_service.invalidate(entity, entity_id, customer_id)
+
+        if self._changed is not None:
+            async with self._changed:
+                self._changed.notify_all()
+
+    def since(self, seq: int, limit: int = 100) -> Tuple[List[Change], bool]:
+        reset = seq > self.last_seq or bool(self.entries and seq < self.entries[0].seq - 1)
+        changes = []
+        for change in reversed(self.entries):
+            if change.seq <= seq:
+                break
+            changes.append(change)
+        changes.reverse()
+        return changes[:limit], reset
+
+    async def wait(self, seq: int, timeout: float) -> None:
+        if self.last_seq != seq or timeout <= 0 or self._changed is None:
+            return
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self.last_seq != seq), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.batch_interval)
+            self._wake.clear()
+            await self.flush()
+
+
+change_log = ChangeLog(settings.changes_max_entries, settings.changes_batch_interval)
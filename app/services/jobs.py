@@ -0,0 +1,299 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from app.config import settings
+from app.services.bulk import export_customer_orders, import_customers, import_orders, iter_spooled_lines
+from app.services.jsonstream import iter_json_records
+from app.services.mappers import map_customer
+from app.services.retailcrm import retailcrm_service
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SWEEP_INTERVAL = 300.0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    kind: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    @property
+    def input_path(self) -> str:
+        return os.path.join(settings.jobs_dir, f"{self.id}.input")
+
+    @property
+    def result_path(self) -> str:
+        return os.path.join(settings.jobs_dir, f"{self.id}.ndjson")
+
+
+JobHandler = Callable[["JobManager", Job], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT, status TEXT, params TEXT, progress TEXT, result TEXT, "
+            "error TEXT, created_at TEXT, started_at TEXT, finished_at TEXT)"
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def save(self, job: Job) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.id, job.kind, job.status, json.dumps(job.params), json.dumps(job.progress),
+                json.dumps(job.result), job.error, job.created_at, job.started_at, job.finished_at
+            )
+        )
+        self._connection.commit()
+
+    def delete(self, job_ids: List[str]) -> None:
+        self._connection.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+        self._connection.commit()
+
+    def load(self) -> List[Job]:
+        rows = self._connection.execute(
+            "SELECT id, kind, status, params, progress, result, error, created_at, started_at, finished_at "
+            "FROM jobs ORDER BY created_at"
+        ).fetchall()
+        return [
+            Job(
+                id=row[0], kind=row[1], status=row[2], params=json.loads(row[3]), progress=json.loads(row[4]),
+                result=json.loads(row[5]), error=row[6], created_at=row[7], started_at=row[8], finished_at=row[9]
+            )
+            for row in rows
+        ]
+
+
+class JobManager:
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._store: Optional[JobStore] = None
+        self._saved_at: Dict[str, float] = {}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        os.makedirs(settings.jobs_dir, exist_ok=True)
+        self._queue = asyncio.Queue()
+
+        if settings.jobs_db_path:
+            self._store = JobStore(settings.jobs_db_path)
+            await asyncio.to_thread(self._store.open)
+            for job in await asyncio.to_thread(self._store.load):
+                self.jobs[job.id] = job
+                if job.status == RUNNING:
+                    job.status = FAILED
+                    job.error = "Interrupted by shutdown"
+                    job.finished_at = _now()
+                    await self._save(job)
+                elif job.status == QUEUED:
+                    self._queue.put_nowait(job)
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(max(1, settings.jobs_workers))]
+        if settings.jobs_retention > 0:
+            self._workers.append(asyncio.create_task(self._sweep_loop()))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._store is not None:
+            await asyncio.to_thread(self._store.close)
+            self._store = None
+
+    async def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, job: Optional[Job] = None) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if job is None:
+            job = Job(kind=kind, params=params or {})
+        self.jobs[job.id] = job
+        await self._save(job)
+        await self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def report(self, job: Job, **progress: Any) -> None:
+        job.progress.update(progress)
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._saved_at.get(job.id, 0.0) >= settings.jobs_progress_interval:
+            await self._save(job)
+
+    async def _save(self, job: Job) -> None:
+        self._saved_at[job.id] = asyncio.get_running_loop().time()
+        if self._store is not None:
+            await asyncio.to_thread(self._store.save, job)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = _now()
+        await self._save(job)
+
+        try:
+            job.result = await self._handlers[job.kind](self, job)
+            job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "Interrupted by shutdown"
+            raise
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        else:
+            if os.path.exists(job.input_path):
+                os.remove(job.input_path)
+        finally:
+            job.finished_at = _now()
+            self._saved_at.pop(job.id, None)
+            await asyncio.shield(self._save(job))
+
+    async def sweep(self) -> int:
+        cutoff = datetime.now(timezone.utc).timestamp() - settings.jobs_retention
+        expired = [
+            job for job in self.jobs.values()
+            if job.status in (SUCCEEDED, FAILED)
+            and job.finished_at is not None
+            and datetime.fromisoformat(job.finished_at).timestamp() < cutoff
+        ]
+        if not expired:
+            return 0
+
+        for job in expired:
+            del self.jobs[job.id]
+            for path in (job.input_path, job.result_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        if self._store is not None:
+            await asyncio.to_thread(self._store.delete, [job.id for job in expired])
+        logger.info("Removed %d expired jobs", len(expired))
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Job sweep failed")
+            await asyncio.sleep(min(SWEEP_INTERVAL, settings.jobs_retention))
+
+    def to_dict(self, job: Job) -> Dict[str, Any]:
+        data = asdict(job)
+        data["result_url"] = f"/api/v1/jobs/{job.id}/result" if os.path.exists(job.result_path) else None
+        return data
+
+
+async def _write_records(
+    manager: JobManager,
+    job: Job,
+    records: AsyncIterator[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    summary = None
+    processed = 0
+    with open(job.result_path, "w", encoding="utf-8") as output:
+        async for record in records:
+            if "summary" in record:
+                summary = record["summary"]
+                continue
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            processed += 1
+            await manager.report(job, processed=processed)
+    return summary if summary is not None else {"processed": processed}
+
+
+async def _input_records(job: Job) -> AsyncIterator[Any]:
+    with open(job.input_path, "rb") as upload:
+        async def read(size: int) -> bytes:
+            return upload.read(size)
+
+        async for record in iter_json_records(read):
+            yield record
+
+
+async def _export_customers(manager: JobManager, job: Job) -> Optional[Dict[str, Any]]:
+    customers = retailcrm_service.iter_customers(**job.params, transform=map_customer)
+    return await _write_records(manager, job, customers)
+
+
+async def _export_orders(manager: JobManager, job: Job) -> Optional[Dict[str, Any]]:
+    if job.params.get("customer_ids") is not None:
+        customer_ids: Any = job.params["customer_ids"]
+    else:
+        async def read_ids() -> AsyncIterator[str]:
+            with open(job.input_path, "rb") as upload:
+                async for line in iter_spooled_lines(upload):
+                    for value in line.replace(",", " ").split():
+                        yield value
+
+        customer_ids = read_ids()
+    return await _write_records(manager, job, export_customer_orders(customer_ids, job.params.get("concurrency")))
+
+
+async def _import_customers(manager: JobManager, job: Job) -> Optional[Dict[str, Any]]:
+    records = import_customers(_input_records(job), job.params.get("concurrency"), job.params.get("idempotency_key"))
+    return await _write_records(manager, job, records)
+
+
+async def _import_orders(manager: JobManager, job: Job) -> Optional[Dict[str, Any]]:
+    records = import_orders(_input_records(job), job.params.get("concurrency"), job.params.get("idempotency_key"))
+    return await _write_records(manager, job, records)
+
+
+job_manager = JobManager()
+job_manager.register("customers_export", _export_customers)
+job_manager.register("orders_export", _export_orders)
+job_manager.register("customers_import", _import_customers)
+job_manager.register("orders_import", _import_orders)
@@ -0,0 +1,139 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+CHUNK_SIZE = 65536
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]}:"
+
+
+class _Reader:
+    def __init__(self, read: Callable[[int], Awaitable[bytes]], chunk_size: int = CHUNK_SIZE):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = await self._read(self._chunk_size)
+        if not chunk:
+            self.eof = True
+            self.buffer = self.buffer[self.pos:] + self._decoder.decode(b"", final=True)
+        else:
+            self.buffer = self.buffer[self.pos:] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    async def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not await self.fill():
+                return ""
+
+    async def expect(self, char: str) -> None:
+        if await self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        await self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not await self.fill():
+                    raise
+                continue
+            if not self.eof and (end == len(self.buffer) or self.buffer[end] not in _DELIMITERS):
+                await self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+async def _iter_array(reader: _Reader) -> AsyncIterator[Any]:
+    await reader.expect("[")
+    if await reader.peek() == "]":
+        reader.pos += 1
+        return
+
+    while True:
+        yield await reader.value()
+        separator = await reader.peek()
+        reader.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' at offset {reader.pos - 1}")
+
+
+async def _iter_lines(reader: _Reader) -> AsyncIterator[Any]:
+    while True:
+        newline = reader.buffer.find("\n", reader.pos)
+        if newline == -1:
+            if await reader.fill():
+                continue
+            line = reader.buffer[reader.pos:]
+            reader.pos = len(reader.buffer)
+        else:
+            line = reader.buffer[reader.pos:newline]
+            reader.pos = newline + 1
+
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+        elif newline == -1:
+            return
+
+
+async def iter_json_array(read: Callable[[int], Awaitable[bytes]]) -> AsyncIterator[Any]:
+    async for item in _iter_array(_Reader(read)):
+        yield item
+
+
+async def read_json_object(
+    read: Callable[[int], Awaitable[bytes]],
+    stream_key: str,
+    transform: Optional[Callable[[Any], Any]] = None
+) -> Dict[str, Any]:
+    reader = _Reader(read)
+    result: Dict[str, Any] = {}
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        return result
+
+    while True:
+        name = await reader.value()
+        if not isinstance(name, str):
+            raise ValueError(f"Expected object key at offset {reader.pos}")
+        await reader.expect(":")
+        if name == stream_key and await reader.peek() == "[":
+            result[name] = [item if transform is None else transform(item) async for item in _iter_array(reader)]
+        else:
+            result[name] = await reader.value()
+
+        separator = await reader.peek()
+        reader.pos += 1
+        if separator == "}":
+            return result
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at offset {reader.pos - 1}")
+
+
+async def iter_json_records(read: Callable[[int], Awaitable[bytes]]) -> AsyncIterator[Any]:
+    reader = _Reader(read)
+    records = _iter_array(reader) if await reader.peek() == "[" else _iter_lines(reader)
+    async for record in records:
+        yield record
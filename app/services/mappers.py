@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from app.models import CustomerCreate, OrderCreate, PaymentCreate
+
+
+def format_datetime(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+
+def map_customer(customer: Dict[str, Any]) -> Dict[str, Any]:
+    phones = customer.get("phones")
+    return {
+        "id": customer["id"],
+        "first_name": customer.get("firstName"),
+        "last_name": customer.get("lastName"),
+        "email": customer.get("email"),
+        "phone": phones[0].get("number") if phones else None,
+        "created_at": customer.get("createdAt")
+    }
+
+
+def map_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": order["id"],
+        "number": order.get("number"),
+        "customer_id": (order.get("customer") or {}).get("id"),
+        "created_at": order.get("createdAt"),
+        "status": order.get("status"),
+        "total_sum": order.get("totalSumm")
+    }
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    allowed = list(allowed)
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [field for field in allowed if field == "id" or field in requested]
+
+
+def select_fields(row: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return row
+    return {field: row[field] for field in fields}
+
+
+def customer_to_retailcrm(customer: CustomerCreate) -> Dict[str, Any]:
+    customer_data = {}
+    
+    if customer.first_name:
+        customer_data["firstName"] = customer.first_name
+    if customer.last_name:
+        customer_data["lastName"] = customer.last_name
+    if customer.email:
+        customer_data["email"] = customer.email
+    if customer.phone:
+        customer_data["phones"] = [{"number": customer.phone}]
+    
+    return customer_data
+
+
+def order_to_retailcrm(order: OrderCreate) -> Dict[str, Any]:
+    order_data = {
+        "customer": {"id": order.customer_id},
+        "items": []
+    }
+    
+    if order.number:
+        order_data["number"] = order.number
+    
+    for item in order.items:
+        order_data["items"].append({
+            "productName": item.product_name,
+            "quantity": item.quantity,
+            "initialPrice": item.price
+        })
+    
+    return order_data
+
+
+def payment_to_retailcrm(payment: PaymentCreate) -> Dict[str, Any]:
+    return {
+        "type": payment.type,
+        "status": payment.status,
+        "amount": payment.amount
+    }
+
+
+def error_detail(result: Dict[str, Any], default: str) -> str:
+    error_msg = result.get("errorMsg", default)
+    errors = result.get("errors", {})
+    return f"{error_msg}. Errors: {errors}" if errors else error_msg
@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING, Iterator
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+if TYPE_CHECKING:
+    from app.services.retailcrm import RetailCRMService
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled by the API",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce the response headers",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled"
+)
+UPSTREAM_LATENCY = Histogram(
+    "retailcrm_request_duration_seconds",
+    "RetailCRM API call latency including retries",
+    ["endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+
+class RetailCRMCollector(Collector):
+    def __init__(self, service: "RetailCRMService"):
+        self.service = service
+
+    def collect(self) -> Iterator[Metric]:
+        service = self.service
+
+        concurrency = GaugeMetricFamily("retailcrm_concurrency", "Adaptive upstream concurrency", labels=["kind"])
+        concurrency.add_metric(["limit"], service.concurrency.limit)
+        concurrency.add_metric(["in_flight"], service.concurrency.in_flight)
+        yield concurrency
+
+        pool = GaugeMetricFamily("retailcrm_pool_connections", "Upstream connection pool", labels=["state"])
+        for state, value in service.pool_stats().items():
+            pool.add_metric([state], value)
+        yield pool
+
+        stats = service.cache.stats()
+        cache = GaugeMetricFamily("retailcrm_cache", "Response cache", labels=["kind"])
+        for kind in ("size", "hit_ratio"):
+            cache.add_metric([kind], stats[kind])
+        yield cache
+
+        lookups = CounterMetricFamily("retailcrm_cache_lookups", "Response cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], stats["hits"])
+        lookups.add_metric(["miss"], stats["misses"])
+        yield lookups
+
+        yield GaugeMetricFamily(
+            "retailcrm_singleflight_in_flight",
+            "Deduplicated upstream fetches in progress",
+            value=len(service.inflight)
+        )
+
+        breaker = GaugeMetricFamily("retailcrm_circuit_state", "Circuit breaker state", labels=["state"])
+        for state in (service.breaker.CLOSED, service.breaker.OPEN, service.breaker.HALF_OPEN):
+            breaker.add_metric([state], 1 if service.breaker.state == state else 0)
+        yield breaker
+
@@ -0,0 +1,329 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.services.retailcrm import RetailCRMError, retailcrm_service
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+HISTORY_LIMIT = 100
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS customers ("
+    "id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, email TEXT, created_at TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS customers_first_name ON customers (first_name)",
+    "CREATE INDEX IF NOT EXISTS customers_last_name ON customers (last_name)",
+    "CREATE INDEX IF NOT EXISTS customers_email ON customers (email)",
+    "CREATE INDEX IF NOT EXISTS customers_created_at ON customers (created_at)",
+    "CREATE TABLE IF NOT EXISTS orders ("
+    "id INTEGER PRIMARY KEY, customer_id INTEGER, created_at TEXT, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS orders_customer_id ON orders (customer_id, id)",
+    "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+)
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    return value.lower() if value else None
+
+
+def _like(value: str) -> str:
+    escaped = value.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _pagination(total: int, page: int, limit: int) -> Dict[str, int]:
+    return {
+        "limit": limit,
+        "totalCount": total,
+        "currentPage": page,
+        "totalPageCount": max(1, -(-total // limit))
+    }
+
+
+class MirrorStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.ready = False
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def open(self) -> None:
+        await asyncio.to_thread(self._open)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    async def get_state(self, key: str) -> Optional[str]:
+        rows = await self._run(lambda db: db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchall())
+        return rows[0][0] if rows else None
+
+    async def set_state(self, key: str, value: Any) -> None:
+        await self._write(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+            [(key, str(value))]
+        )
+
+    async def upsert_customers(self, customers: Iterable[Dict[str, Any]]) -> None:
+        await self._write(
+            "INSERT OR REPLACE INTO customers (id, first_name, last_name, email, created_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    customer["id"],
+                    _lower(customer.get("firstName")),
+                    _lower(customer.get("lastName")),
+                    _lower(customer.get("email")),
+                    customer.get("createdAt"),
+                    json.dumps(customer, ensure_ascii=False)
+                )
+                for customer in customers
+            ]
+        )
+
+    async def upsert_orders(self, orders: Iterable[Dict[str, Any]]) -> None:
+        await self._write(
+            "INSERT OR REPLACE INTO orders (id, customer_id, created_at, data) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    order["id"],
+                    (order.get("customer") or {}).get("id"),
+                    order.get("createdAt"),
+                    json.dumps(order, ensure_ascii=False)
+                )
+                for order in orders
+            ]
+        )
+
+    async def delete(self, table: str, ids: Iterable[int]) -> None:
+        if table not in ("customers", "orders"):
+            raise ValueError(f"Unknown mirror table: {table}")
+        await self._write(f"DELETE FROM {table} WHERE id = ?", [(entity_id,) for entity_id in ids])
+
+    async def query_customers(
+        self,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        email: Optional[str] = None,
+        created_at_from: Optional[str] = None,
+        created_at_to: Optional[str] = None,
+        page: int = 1,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        conditions = []
+        args: List[Any] = []
+        for column, value in (("first_name", first_name), ("last_name", last_name), ("email", email)):
+            if value:
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                args.append(_like(value))
+        if created_at_from:
+            conditions.append("created_at >= ?")
+            args.append(created_at_from)
+        if created_at_to:
+            conditions.append("created_at <= ?")
+            args.append(created_at_to)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        total, rows = await self._page(f"FROM customers {where}", args, page, limit)
+        return {
+            "success": True,
+            "pagination": _pagination(total, page, limit),
+            "customers": [json.loads(row[0]) for row in rows]
+        }
+
+    async def iter_customers(self, batch_size: int = BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        last_id = 0
+        while True:
+            rows = await self._run(lambda db: db.execute(
+                "SELECT id, data FROM customers WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall())
+            for row in rows:
+                yield json.loads(row[1])
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    async def query_orders(self, customer_id: Optional[int] = None, page: int = 1, limit: int = 20) -> Dict[str, Any]:
+        where, args = ("WHERE customer_id = ?", [customer_id]) if customer_id else ("", [])
+        total, rows = await self._page(f"FROM orders {where}", args, page, limit)
+        return {
+            "success": True,
+            "pagination": _pagination(total, page, limit),
+            "orders": [json.loads(row[0]) for row in rows]
+        }
+
+    async def _page(self, query: str, args: List[Any], page: int, limit: int) -> Tuple[int, List[Tuple[str]]]:
+        def run(db: sqlite3.Connection) -> Tuple[int, List[Tuple[str]]]:
+            total = db.execute(f"SELECT COUNT(*) {query}", args).fetchone()[0]
+            rows = db.execute(
+                f"SELECT data {query} ORDER BY id LIMIT ? OFFSET ?",
+                [*args, limit, (page - 1) * limit]
+            ).fetchall()
+            return total, rows
+
+        return await self._run(run)
+
+    async def _write(self, statement: str, rows: List[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+
+        def run(db: sqlite3.Connection) -> None:
+            db.executemany(statement, rows)
+            db.commit()
+
+        await self._run(run)
+
+    async def _run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        def locked() -> Any:
+            with self._lock:
+                return fn(self._connection)
+
+        return await asyncio.to_thread(locked)
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+        row = self._connection.execute("SELECT value FROM sync_state WHERE key = 'initialized'").fetchone()
+        self.ready = bool(row and row[0] == "1")
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class MirrorSync:
+    ENTITIES = {
+        "customers": ("customer", "get_customers_history", "get_customers_by_ids", "upsert_customers"),
+        "orders": ("order", "get_orders_history", "get_orders_by_ids", "upsert_orders")
+    }
+
+    def __init__(self, store: MirrorStore):
+        self.store = store
+        self.last_sync: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def wake(self, entity: Optional[str] = None, entity_id: Optional[int] = None, customer_id: Optional[int] = None) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def start(self) -> None:
+        self._wake = asyncio.Event()
+        retailcrm_service.write_listeners.append(self.wake)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.wake in retailcrm_service.write_listeners:
+            retailcrm_service.write_listeners.remove(self.wake)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sync(self) -> None:
+        if not self.store.ready:
+            await self._initial_load()
+        for table in self.ENTITIES:
+            await self._sync_table(table)
+        self.last_sync = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                logger.exception("Mirror sync failed")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.mirror_sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _initial_load(self) -> None:
+        started = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        batch: List[Dict[str, Any]] = []
+        async for customer in retailcrm_service.iter_customers():
+            batch.append(customer)
+            if len(batch) >= BATCH_SIZE:
+                await self.store.upsert_customers(batch)
+                batch = []
+        await self.store.upsert_customers(batch)
+
+        batch = []
+        async for order in retailcrm_service.iter_orders():
+            batch.append(order)
+            if len(batch) >= BATCH_SIZE:
+                await self.store.upsert_orders(batch)
+                batch = []
+        await self.store.upsert_orders(batch)
+
+        for table in self.ENTITIES:
+            await self.store.set_state(f"{table}_start_date", started)
+        await self.store.set_state("initialized", 1)
+        self.store.ready = True
+
+    async def _sync_table(self, table: str) -> None:
+        entity, history_method, by_ids_method, upsert_method = self.ENTITIES[table]
+        since_id = int(await self.store.get_state(f"{table}_since_id") or 0)
+        start_date = None if since_id else await self.store.get_state(f"{table}_start_date")
+
+        changed = set()
+        deleted = set()
+        last_id = since_id
+        while True:
+            result = await getattr(retailcrm_service, history_method)(
+                since_id=last_id or None,
+                start_date=start_date if not last_id else None,
+                limit=HISTORY_LIMIT
+            )
+            if not result.get("success"):
+                raise RetailCRMError(result.get("errorMsg", f"Failed to fetch {table} history"))
+
+            history = result.get("history", [])
+            for change in history:
+                last_id = max(last_id, change["id"])
+                entity_id = (change.get(entity) or {}).get("id")
+                if entity_id is None:
+                    continue
+                if change.get("deleted"):
+                    deleted.add(entity_id)
+                else:
+                    changed.add(entity_id)
+
+            if len(history) < HISTORY_LIMIT:
+                break
+
+        changed -= deleted
+        ids = sorted(changed)
+        for start in range(0, len(ids), 100):
+            result = await getattr(retailcrm_service, by_ids_method)(ids[start:start + 100])
+            if not result.get("success"):
+                raise RetailCRMError(result.get("errorMsg", f"Failed to fetch changed {table}"))
+            await getattr(self.store, upsert_method)(result.get(table, []))
+        await self.store.delete(table, deleted)
+
+        if last_id != since_id:
+            await self.store.set_state(f"{table}_since_id", last_id)
+
+
+mirror_store = MirrorStore(settings.mirror_db_path)
+mirror_sync = MirrorSync(mirror_store)
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, List
+
+
+def encode_cursor(params: Dict[str, Any]) -> str:
+    values = {key: value for key, value in params.items() if value is not None}
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+
+    params = {key: values.get(key, default) for key, default in defaults.items()}
+    for key in ("page", "limit"):
+        if not isinstance(params.get(key), int) or params[key] < 1:
+            raise ValueError("Invalid cursor")
+    return params
+
+
+def page_envelope(result: Dict[str, Any], items: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+    page = params["page"]
+    limit = params["limit"]
+    pagination = result.get("pagination") or {}
+    total_count = pagination.get("totalCount", (page - 1) * limit + len(items))
+    total_pages = pagination.get("totalPageCount", page)
+
+    return {
+        "items": items,
+        "total_count": total_count,
+        "total_pages": total_pages,
+        "page": page,
+        "limit": limit,
+        "next_cursor": encode_cursor({**params, "page": page + 1}) if page < total_pages else None,
+        "prev_cursor": encode_cursor({**params, "page": page - 1}) if page > 1 else None
+    }
@@ -0,0 +1,79 @@
+import random
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._trial_at = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state != self.HALF_OPEN:
+            return False
+        now = time.monotonic()
+        if self._half_open_calls >= self.half_open_max_calls and now - self._trial_at >= self.reset_timeout:
+            self._half_open_calls = 0
+        if self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            self._trial_at = now
+            return True
+        return False
+
+    def release(self) -> None:
+        if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        snapshot = {"state": state, "failures": self.failures}
+        if state == self.OPEN:
+            snapshot["retry_in"] = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 3)
+        return snapshot
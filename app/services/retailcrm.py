@@ -1,7 +1,32 @@
+import asyncio
 import httpx
 import json
-from typing import Optional, Dict, Any
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Deque, Hashable, List
 from app.config import settings
+from app.services.cache import TTLCache
+from app.services.jsonstream import CHUNK_SIZE, read_json_object
+from app.services.metrics import UPSTREAM_LATENCY
+from app.services.ratelimit import AdaptiveConcurrencyLimiter, TokenBucket
+from app.services.resilience import CircuitBreaker, CircuitOpenError, backoff_delay, retry_after_seconds
+from app.services.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from app.services.mirror import MirrorStore
+
+Transform = Callable[[Dict[str, Any]], Dict[str, Any]]
+Consume = Callable[[httpx.Response], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUSES = (429, 503)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetailCRMError(Exception):
+    pass
 
 
 class RetailCRMService:
@@ -9,70 +34,415 @@ class RetailCRMService:
         self.base_url = settings.retailcrm_url.rstrip('/')
         self.api_key = settings.retailcrm_api_key
         self.api_version = "v5"
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = TTLCache(maxsize=settings.cache_maxsize, ttl=settings.cache_ttl)
+        self.inflight = SingleFlight()
+        self.rate_limiter = TokenBucket(rate=settings.retailcrm_rate_limit, burst=settings.retailcrm_rate_burst)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=settings.retailcrm_initial_concurrency,
+            minimum=settings.retailcrm_min_concurrency,
+            maximum=settings.retailcrm_max_concurrency
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_timeout=settings.circuit_reset_timeout
+        )
+        self.mirror: Optional["MirrorStore"] = None
+        self.write_listeners: List[Callable[[str, Optional[int], Optional[int]], None]] = []
+        self._probe: Optional[Dict[str, Any]] = None
+        self._probe_at = 0.0
+    
+    def _notify_write(self, entity: str, entity_id: Optional[int] = None, customer_id: Optional[int] = None) -> None:
+        for listener in self.write_listeners:
+            listener(entity, entity_id, customer_id)
+    
+    def invalidate(self, entity: str, entity_id: Optional[int] = None, customer_id: Optional[int] = None) -> None:
+        if entity == "customer":
+            self.cache.invalidate_tag("customers")
+            if entity_id:
+                self.cache.invalidate_tag(f"orders:customer:{entity_id}")
+        else:
+            if customer_id:
+                self.cache.invalidate_tag(f"orders:customer:{customer_id}")
+            if entity_id:
+                self.cache.invalidate_tag(f"order:{entity_id}")
+            self.cache.invalidate_tag("orders:all")
+        self._notify_write(entity)
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=settings.retailcrm_timeout,
+            follow_redirects=True,
+            http2=settings.retailcrm_http2,
+            limits=httpx.Limits(
+                max_connections=settings.retailcrm_max_connections,
+                max_keepalive_connections=settings.retailcrm_max_keepalive_connections,
+                keepalive_expiry=settings.retailcrm_keepalive_expiry
+            ),
+            headers={
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                "Accept": "application/json"
+            }
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    def pool_stats(self) -> Dict[str, int]:
+        connections = []
+        if self._client is not None and not self._client.is_closed:
+            pool = getattr(self._client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "active": len(connections) - idle,
+            "idle": idle,
+            "max": settings.retailcrm_max_connections
+        }
+    
+    async def probe(self) -> Dict[str, Any]:
+        if self._probe is not None and time.monotonic() - self._probe_at < settings.health_probe_ttl:
+            return self._probe
+        return await self.inflight.do("probe", self._run_probe)
+    
+    async def _run_probe(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        error = None
+        try:
+            response = await self._send_with_retries(
+                "GET",
+                f"{self.base_url}/api/credentials",
+                False,
+                params={"apiKey": self.api_key},
+                limited=False,
+                timeout=httpx.Timeout(settings.health_probe_timeout)
+            )
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except CircuitOpenError as e:
+            error = str(e)
+        except httpx.TimeoutException:
+            error = f"Probe timed out after {settings.health_probe_timeout}s"
+        except httpx.HTTPError as e:
+            error = str(e) or type(e).__name__
+        
+        self._probe = {
+            "ok": error is None,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": error,
+            "checked_at": time.time()
+        }
+        self._probe_at = time.monotonic()
+        return self._probe
+    
+    async def start(self) -> None:
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+    
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def _get_url(self, endpoint: str) -> str:
         return f"{self.base_url}/api/{self.api_version}/{endpoint}"
     
+    async def _exchange(self, request: httpx.Request, consume: Optional[Consume]) -> httpx.Response:
+        response = await self.client.send(request, stream=consume is not None)
+        if consume is not None:
+            await consume(response)
+        return response
+    
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        consume: Optional[Consume] = None,
+        limited: bool = True,
+        **kwargs: Any
+    ) -> httpx.Response:
+        request = self.client.build_request(method, url, **kwargs)
+        if not limited:
+            return await self._exchange(request, consume)
+        
+        await self.rate_limiter.acquire()
+        generation = await self.concurrency.acquire()
+        overloaded = False
+        succeeded = False
+        try:
+            response = await self._exchange(request, consume)
+            overloaded = response.status_code in OVERLOAD_STATUSES
+            succeeded = response.status_code < 500
+            return response
+        except httpx.TimeoutException:
+            overloaded = True
+            raise
+        finally:
+            await self.concurrency.release(generation, overloaded, succeeded)
+    
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        retryable: bool,
+        consume: Optional[Consume] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        attempts = max(1, settings.retailcrm_retry_attempts) if retryable else 1
+        
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError("RetailCRM is temporarily unavailable (circuit breaker open)")
+            
+            retry_after = None
+            try:
+                response = await self._send(method, url, consume=consume, **kwargs)
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                
+                if response.status_code == 429:
+                    self.breaker.release()
+                else:
+                    self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    return response
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                await response.aclose()
+            
+            delay = backoff_delay(attempt, settings.retailcrm_retry_base_delay, settings.retailcrm_retry_max_delay)
+            if retry_after is not None:
+                delay = min(max(delay, retry_after), settings.retailcrm_retry_max_delay)
+            await asyncio.sleep(delay)
+    
     async def _make_request(
         self, 
         method: str, 
         endpoint: str, 
         params: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
-        json_param: Optional[str] = None
+        json_param: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        stream_key: Optional[str] = None,
+        transform: Optional[Transform] = None,
+        label: Optional[str] = None
     ) -> Dict[str, Any]:
         url = self._get_url(endpoint)
+        label = label or endpoint
         
         if params is None:
             params = {}
         params["apiKey"] = self.api_key
         
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "application/json"
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        started = time.perf_counter()
+        try:
             if method.upper() == "GET":
-                print(f"DEBUG GET: URL: {url}")
-                print(f"DEBUG GET: Params: {params}")
-                response = await client.get(url, params=params, headers=headers)
-                print(f"DEBUG GET: Response status: {response.status_code}")
-                print(f"DEBUG GET: Response text: {response.text[:500]}")
+                if stream_key is not None:
+                    streamed: Dict[str, Any] = {}
+                    
+                    async def consume(response: httpx.Response) -> None:
+                        streamed["result"] = await self._read_streamed(response, stream_key, transform)
+                    
+                    response = await self._send_with_retries("GET", url, True, consume=consume, params=params)
+                    self._record_response("GET", label, params, response.status_code, started)
+                    return streamed["result"]
+                response = await self._send_with_retries("GET", url, True, params=params)
+                self._record_response("GET", label, params, response.status_code, started)
             elif method.upper() == "POST":
                 if json_param and data:
                     form_data = {json_param: json.dumps(data, ensure_ascii=False)}
                 else:
                     form_data = data or {}
                 
-                print(f"DEBUG POST: URL: {url}")
-                print(f"DEBUG POST: Form data: {form_data}")
+                headers = {"Content-Type": "application/x-www-form-urlencoded"}
+                if idempotency_key:
+                    headers["Idempotency-Key"] = idempotency_key
                 
-                response = await client.post(
-                    url, 
+                response = await self._send_with_retries(
+                    "POST",
+                    url,
+                    bool(idempotency_key),
                     params=params,
                     data=form_data,
-                    headers={**headers, "Content-Type": "application/x-www-form-urlencoded"}
+                    headers=headers
                 )
-                
-                print(f"DEBUG POST: Response status: {response.status_code}")
-                print(f"DEBUG POST: Response text: {response.text[:500]}")
+                self._record_response("POST", label, params, response.status_code, started)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
-            
+        except CircuitOpenError as e:
+            self._record_response(method.upper(), label, params, "circuit_open", started)
+            return {
+                "success": False,
+                "errorMsg": str(e)
+            }
+        except httpx.HTTPError:
+            self._record_response(method.upper(), label, params, "error", started)
+            raise
+        
+        if response.status_code >= 400:
+            return {
+                "success": False,
+                "errorMsg": f"HTTP {response.status_code}: {response.text}"
+            }
+        
+        try:
+            return response.json()
+        except:
+            return {
+                "success": False,
+                "errorMsg": f"Invalid JSON response: {response.text}"
+            }
+    
+    def _record_response(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        status: Any,
+        started: float
+    ) -> None:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_LATENCY.labels(endpoint, method, str(status)).observe(elapsed)
+        
+        level = logging.DEBUG if isinstance(status, int) and status < 400 else logging.WARNING
+        if logger.isEnabledFor(level):
+            logger.log(level, "RetailCRM %s %s -> %s", method, endpoint, status, extra={
+                "method": method,
+                "endpoint": endpoint,
+                "params": params,
+                "status": status,
+                "elapsed_ms": round(elapsed * 1000, 1)
+            })
+    
+    async def _read_streamed(
+        self,
+        response: httpx.Response,
+        stream_key: str,
+        transform: Optional[Transform]
+    ) -> Dict[str, Any]:
+        try:
             if response.status_code >= 400:
+                await response.aread()
                 return {
                     "success": False,
                     "errorMsg": f"HTTP {response.status_code}: {response.text}"
                 }
             
+            chunks = response.aiter_bytes(CHUNK_SIZE)
+            
+            async def read(size: int) -> bytes:
+                return await anext(chunks, b"")
+            
             try:
-                return response.json()
-            except:
+                return await read_json_object(read, stream_key, transform)
+            except ValueError as e:
                 return {
                     "success": False,
-                    "errorMsg": f"Invalid JSON response: {response.text}"
+                    "errorMsg": f"Invalid JSON response: {e}"
                 }
+        finally:
+            await response.aclose()
+    
+    def _transformed(self, result: Dict[str, Any], key: str, transform: Optional[Transform]) -> Dict[str, Any]:
+        if transform is not None and key in result:
+            result[key] = [transform(item) for item in result[key]]
+        return result
+    
+    def _cache_key(self, endpoint: str, params: Dict[str, Any], transform: Optional[Transform] = None) -> Hashable:
+        return endpoint, tuple(sorted((key, str(value)) for key, value in params.items())), transform
+    
+    async def _cached_get(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        tags_for: Callable[[Dict[str, Any]], List[str]],
+        cached: bool = True,
+        transform: Optional[Transform] = None
+    ) -> Dict[str, Any]:
+        key = self._cache_key(endpoint, params, transform)
+        if not cached:
+            return await self.inflight.do(key, lambda: self._fetch(key, endpoint, params, None, transform))
+        
+        if settings.cache_enabled:
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+        
+        return await self.inflight.do(key, lambda: self._fetch(key, endpoint, params, tags_for, transform))
+    
+    async def _fetch(
+        self,
+        key: Hashable,
+        endpoint: str,
+        params: Dict[str, Any],
+        tags_for: Optional[Callable[[Dict[str, Any]], List[str]]],
+        transform: Optional[Transform] = None
+    ) -> Dict[str, Any]:
+        generation = self.cache.generation
+        result = await self._make_request("GET", endpoint, params=dict(params), stream_key=endpoint, transform=transform)
+        if tags_for is not None and settings.cache_enabled and result.get("success") and self.cache.generation == generation:
+            self.cache.set(key, result, tags_for(result))
+        return result
+    
+    async def _walk_pages(
+        self,
+        fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+        key: str,
+        prefetch: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        prefetch = max(1, prefetch or settings.export_prefetch_pages)
+        
+        result = await fetch_page(1)
+        if not result.get("success"):
+            raise RetailCRMError(result.get("errorMsg", f"Failed to fetch {key}"))
+        total_pages = result.get("pagination", {}).get("totalPageCount", 1)
+        for item in result.get(key, []):
+            yield item
+        
+        pending: Deque[asyncio.Future] = deque()
+        next_page = 2
+        try:
+            while next_page <= total_pages or pending:
+                while next_page <= total_pages and len(pending) < prefetch:
+                    pending.append(asyncio.ensure_future(fetch_page(next_page)))
+                    next_page += 1
+                
+                result = await pending.popleft()
+                if not result.get("success"):
+                    raise RetailCRMError(result.get("errorMsg", f"Failed to fetch {key}"))
+                for item in result.get(key, []):
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _history_params(
+        self,
+        since_id: Optional[int],
+        start_date: Optional[str],
+        page: int,
+        limit: int
+    ) -> Dict[str, Any]:
+        params = {
+            "page": page,
+            "limit": limit
+        }
+        if since_id:
+            params["filter[sinceId]"] = since_id
+        if start_date:
+            params["filter[startDate]"] = start_date
+        return params
     
     async def get_customers(
         self, 
@@ -82,8 +452,22 @@ class RetailCRMService:
         created_at_from: Optional[str] = None,
         created_at_to: Optional[str] = None,
         page: int = 1,
-        limit: int = 20
+        limit: int = 20,
+        cached: bool = True,
+        transform: Optional[Transform] = None
     ) -> Dict[str, Any]:
+        if cached and self.mirror is not None and self.mirror.ready:
+            result = await self.mirror.query_customers(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                created_at_from=created_at_from,
+                created_at_to=created_at_to,
+                page=page,
+                limit=limit
+            )
+            return self._transformed(result, "customers", transform)
+        
         params = {
             "page": page,
             "limit": limit
@@ -105,17 +489,129 @@ class RetailCRMService:
             for key, value in filter_params.items():
                 params[f"filter[{key}]"] = value
         
+        return await self._cached_get("customers", params, lambda result: ["customers"], cached=cached, transform=transform)
+    
+    async def iter_customers(
+        self,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        email: Optional[str] = None,
+        created_at_from: Optional[str] = None,
+        created_at_to: Optional[str] = None,
+        limit: int = 100,
+        prefetch: Optional[int] = None,
+        transform: Optional[Transform] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async def fetch_page(page: int) -> Dict[str, Any]:
+            return await self.get_customers(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                created_at_from=created_at_from,
+                created_at_to=created_at_to,
+                page=page,
+                limit=limit,
+                cached=False,
+                transform=transform
+            )
+        
+        async for customer in self._walk_pages(fetch_page, "customers", prefetch):
+            yield customer
+    
+    def _same_entity(self, sent: Dict[str, Any], found: Dict[str, Any], fields: List[str]) -> bool:
+        for field in fields:
+            expected = sent.get(field)
+            if isinstance(expected, dict):
+                if expected.get("id") is not None and expected.get("id") != (found.get(field) or {}).get("id"):
+                    return False
+            elif isinstance(expected, (int, float)) and not isinstance(expected, bool):
+                try:
+                    if float(found.get(field)) != float(expected):
+                        return False
+                except (TypeError, ValueError):
+                    return False
+            elif expected is not None and str(expected) != str(found.get(field)):
+                return False
+        return True
+    
+    def _recovered(
+        self,
+        result: Dict[str, Any],
+        sent: Dict[str, Any],
+        found: Optional[Dict[str, Any]],
+        fields: List[str],
+        idempotency_key: str
+    ) -> Dict[str, Any]:
+        if found is None:
+            return result
+        if not self._same_entity(sent, found, fields):
+            return {
+                "success": False,
+                "errorMsg": f"Idempotency-Key {idempotency_key} was already used for a different request"
+            }
+        logger.info("Create retried with Idempotency-Key %s resolved to existing id %s", idempotency_key, found.get("id"))
+        return {"success": True, "id": found.get("id")}
+    
+    async def _find_by_external_id(self, endpoint: str, key: str, external_id: str) -> Optional[Dict[str, Any]]:
+        result = await self._make_request("GET", endpoint, params={"filter[externalIds][]": [external_id], "limit": 20})
+        for entity in result.get(key, []) if result.get("success") else []:
+            if entity.get("externalId") == external_id:
+                return entity
+        return None
+    
+    async def _find_payment_by_external_id(self, order_id: int, external_id: str) -> Optional[Dict[str, Any]]:
+        result = await self._make_request("GET", f"orders/{order_id}", params={"by": "id"}, label="orders/get")
+        payments = (result.get("order") or {}).get("payments") or [] if result.get("success") else []
+        if isinstance(payments, dict):
+            payments = list(payments.values())
+        for payment in payments:
+            if payment.get("externalId") == external_id:
+                return payment
+        return None
+    
+    async def create_customer(
+        self,
+        customer_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if idempotency_key:
+            customer_data = {"externalId": idempotency_key, **customer_data}
+        result = await self._make_request(
+            "POST", "customers/create", data=customer_data, json_param="customer", idempotency_key=idempotency_key
+        )
+        if idempotency_key and not result.get("success"):
+            found = await self._find_by_external_id("customers", "customers", customer_data["externalId"])
+            result = self._recovered(result, customer_data, found, ["firstName", "lastName", "email"], idempotency_key)
+        if result.get("success"):
+            self.cache.invalidate_tag("customers")
+            self._notify_write("customer", result.get("id"))
+        return result
+    
+    async def get_customers_by_ids(self, ids: List[int]) -> Dict[str, Any]:
+        params = {"filter[ids][]": list(ids), "limit": 100}
         return await self._make_request("GET", "customers", params=params)
     
-    async def create_customer(self, customer_data: Dict[str, Any]) -> Dict[str, Any]:
-        return await self._make_request("POST", "customers/create", data=customer_data, json_param="customer")
+    async def get_customers_history(
+        self,
+        since_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        page: int = 1,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        return await self._make_request("GET", "customers/history", params=self._history_params(since_id, start_date, page, limit))
     
     async def get_orders(
         self,
         customer_id: Optional[int] = None,
         page: int = 1,
-        limit: int = 20
+        limit: int = 20,
+        cached: bool = True,
+        transform: Optional[Transform] = None
     ) -> Dict[str, Any]:
+        if cached and self.mirror is not None and self.mirror.ready:
+            result = await self.mirror.query_orders(customer_id=customer_id, page=page, limit=limit)
+            return self._transformed(result, "orders", transform)
+        
         params = {
             "page": page,
             "limit": limit
@@ -124,18 +620,81 @@ class RetailCRMService:
         if customer_id:
             params["filter[customerId]"] = customer_id
         
+        def tags_for(result: Dict[str, Any]) -> List[str]:
+            tags = [f"orders:customer:{customer_id}" if customer_id else "orders:all"]
+            tags.extend(f"order:{order['id']}" for order in result.get("orders", []) if "id" in order)
+            return tags
+        
+        return await self._cached_get("orders", params, tags_for, cached=cached, transform=transform)
+    
+    async def iter_orders(
+        self,
+        customer_id: Optional[int] = None,
+        limit: int = 100,
+        prefetch: Optional[int] = None,
+        transform: Optional[Transform] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async def fetch_page(page: int) -> Dict[str, Any]:
+            return await self.get_orders(
+                customer_id=customer_id, page=page, limit=limit, cached=False, transform=transform
+            )
+        
+        async for order in self._walk_pages(fetch_page, "orders", prefetch):
+            yield order
+    
+    async def get_orders_by_ids(self, ids: List[int]) -> Dict[str, Any]:
+        params = {"filter[ids][]": list(ids), "limit": 100}
         return await self._make_request("GET", "orders", params=params)
     
-    async def create_order(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
-        return await self._make_request("POST", "orders/create", data=order_data, json_param="order")
+    async def get_orders_history(
+        self,
+        since_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        page: int = 1,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        return await self._make_request("GET", "orders/history", params=self._history_params(since_id, start_date, page, limit))
+    
+    async def create_order(
+        self,
+        order_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if idempotency_key:
+            order_data = {"externalId": idempotency_key, **order_data}
+        result = await self._make_request(
+            "POST", "orders/create", data=order_data, json_param="order", idempotency_key=idempotency_key
+        )
+        if idempotency_key and not result.get("success"):
+            found = await self._find_by_external_id("orders", "orders", order_data["externalId"])
+            result = self._recovered(result, order_data, found, ["number", "customer"], idempotency_key)
+        if result.get("success"):
+            customer_id = order_data.get("customer", {}).get("id")
+            if customer_id:
+                self.cache.invalidate_tag(f"orders:customer:{customer_id}")
+            self.cache.invalidate_tag("orders:all")
+            self._notify_write("order", result.get("id"), customer_id)
+        return result
     
     async def create_payment(
         self, 
         order_id: int, 
-        payment_data: Dict[str, Any]
+        payment_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
-        payment_data["order"] = {"id": order_id}
-        return await self._make_request("POST", "orders/payments/create", data=payment_data, json_param="payment")
+        payment_data = {**payment_data, "order": {"id": order_id}}
+        if idempotency_key:
+            payment_data = {"externalId": idempotency_key, **payment_data}
+        result = await self._make_request(
+            "POST", "orders/payments/create", data=payment_data, json_param="payment", idempotency_key=idempotency_key
+        )
+        if idempotency_key and not result.get("success"):
+            found = await self._find_payment_by_external_id(order_id, payment_data["externalId"])
+            result = self._recovered(result, payment_data, found, ["amount", "type"], idempotency_key)
+        if result.get("success"):
+            self.cache.invalidate_tag(f"order:{order_id}")
+            self._notify_write("order", order_id)
+        return result
 
 
 retailcrm_service = RetailCRMService()
\ No newline at end of file
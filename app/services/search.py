@@ -0,0 +1,358 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from app.config import settings
+from app.services.changes import change_log
+from app.services.mappers import map_customer
+from app.services.mirror import mirror_store
+from app.services.retailcrm import RetailCRMError, retailcrm_service
+
+logger = logging.getLogger(__name__)
+
+MAX_PREFIX_TERMS = 200
+MIN_SIMILARITY = 0.3
+MIN_FUZZY_LENGTH = 4
+MIN_FUZZY_TERM_GRAMS = 3
+UPDATE_BATCH_SIZE = 100
+SORTED_POSTING_MIN = 1000
+
+_WORD = re.compile(r"[\w@.+-]+")
+_NON_DIGIT = re.compile(r"\D")
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    digits = _NON_DIGIT.sub("", value or "")
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    return digits
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _terms(customer: Dict[str, Any]) -> Set[str]:
+    terms = set()
+    for value in (customer.get("first_name"), customer.get("last_name")):
+        if value:
+            terms.update(_WORD.findall(value.lower()))
+    email = (customer.get("email") or "").lower()
+    if email:
+        terms.add(email)
+        terms.update(email.split("@", 1))
+    return terms
+
+
+class CustomerSearchIndex:
+    def __init__(self):
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self._term_docs: Dict[str, Set[int]] = defaultdict(set)
+        self._trigram_terms: Dict[str, Set[str]] = defaultdict(set)
+        self._term_grams: Dict[str, int] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        self._sorted_postings: Dict[str, List[int]] = {}
+        self._phone_docs: Dict[str, Set[int]] = defaultdict(set)
+        self._trigram_phones: Dict[str, Set[str]] = defaultdict(set)
+        self._doc_keys: Dict[int, Tuple[Set[str], str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, customer: Dict[str, Any]) -> None:
+        customer_id = customer["id"]
+        if customer_id in self.docs:
+            self.remove(customer_id)
+
+        terms = _terms(customer)
+        phone = normalize_phone(customer.get("phone"))
+        self.docs[customer_id] = customer
+        self._doc_keys[customer_id] = (terms, phone)
+
+        for term in terms:
+            if term not in self._term_docs:
+                if self._sorted_terms is not None:
+                    bisect.insort(self._sorted_terms, term)
+                grams = _trigrams(term)
+                self._term_grams[term] = len(grams)
+                for trigram in grams:
+                    self._trigram_terms[trigram].add(term)
+            self._term_docs[term].add(customer_id)
+            self._sorted_postings.pop(term, None)
+
+        if phone:
+            if phone not in self._phone_docs:
+                for trigram in _trigrams(phone):
+                    self._trigram_phones[trigram].add(phone)
+            self._phone_docs[phone].add(customer_id)
+
+    def remove(self, customer_id: int) -> None:
+        self.docs.pop(customer_id, None)
+        terms, phone = self._doc_keys.pop(customer_id, (set(), ""))
+
+        for term in terms:
+            docs = self._term_docs.get(term)
+            if docs is None:
+                continue
+            docs.discard(customer_id)
+            self._sorted_postings.pop(term, None)
+            if not docs:
+                del self._term_docs[term]
+                del self._term_grams[term]
+                if self._sorted_terms is not None:
+                    del self._sorted_terms[bisect.bisect_left(self._sorted_terms, term)]
+                for trigram in _trigrams(term):
+                    self._trigram_terms[trigram].discard(term)
+
+        if phone and phone in self._phone_docs:
+            self._phone_docs[phone].discard(customer_id)
+            if not self._phone_docs[phone]:
+                del self._phone_docs[phone]
+                for trigram in _trigrams(phone):
+                    self._trigram_phones[trigram].discard(phone)
+
+    def _sorted_docs(self, term: str) -> List[int]:
+        docs = self._term_docs[term]
+        if len(docs) < SORTED_POSTING_MIN:
+            return sorted(docs)
+        posting = self._sorted_postings.get(term)
+        if posting is None:
+            posting = self._sorted_postings[term] = sorted(docs)
+        return posting
+
+    def sort_terms(self) -> None:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._term_docs)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, Dict[str, Any]]]:
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        digits = normalize_phone(query)
+        if len(digits) >= 3 and not any(char.isalpha() for char in query):
+            scores = self._search_phone(digits)
+        else:
+            tokens = _WORD.findall(query)
+            if len(tokens) == 1:
+                scores = self._search_token(tokens[0], limit)
+            else:
+                scores = self._search_terms(tokens, limit)
+
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(round(score, 3), self.docs[customer_id]) for customer_id, score in ranked]
+
+    def _search_phone(self, digits: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for phone in self._phones_containing(digits):
+            score = 3.0 if phone == digits else 2.0 if phone.endswith(digits) else 1.0
+            for customer_id in self._phone_docs[phone]:
+                scores[customer_id] = max(scores.get(customer_id, 0.0), score)
+        return scores
+
+    def _phones_containing(self, digits: str) -> List[str]:
+        inner = {digits[i:i + 3] for i in range(len(digits) - 2)}
+        postings = sorted((self._trigram_phones.get(trigram, set()) for trigram in inner), key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+        return [phone for phone in candidates if digits in phone]
+
+    def _search_token(self, token: str, limit: int) -> Dict[int, float]:
+        tiers: Dict[float, List[str]] = defaultdict(list)
+        for term, score in self._match_term(token, limit).items():
+            tiers[score].append(term)
+
+        scores: Dict[int, float] = {}
+        for score in sorted(tiers, reverse=True):
+            for customer_id in heapq.merge(*(self._sorted_docs(term) for term in tiers[score])):
+                if customer_id not in scores:
+                    scores[customer_id] = score
+                    if len(scores) >= limit:
+                        return scores
+        return scores
+
+    def _search_terms(self, tokens: List[str], limit: int) -> Dict[int, float]:
+        matches = []
+        for token in tokens:
+            token_matches = self._match_term(token, limit)
+            if not token_matches:
+                return {}
+            size = sum(len(self._term_docs[term]) for term in token_matches)
+            matches.append((size, token_matches))
+        matches.sort(key=lambda item: item[0])
+
+        total: Dict[int, float] = {}
+        for term, score in matches[0][1].items():
+            for customer_id in self._term_docs[term]:
+                if score > total.get(customer_id, 0.0):
+                    total[customer_id] = score
+
+        for _, token_matches in matches[1:]:
+            narrowed = {}
+            for customer_id, score in total.items():
+                best = max((token_matches.get(term, 0.0) for term in self._doc_keys[customer_id][0]), default=0.0)
+                if best:
+                    narrowed[customer_id] = score + best
+            total = narrowed
+            if not total:
+                return {}
+        return total
+
+    def _match_term(self, token: str, limit: int) -> Dict[str, float]:
+        matches: Dict[str, float] = {}
+        if token in self._term_docs:
+            matches[token] = 3.0
+
+        self.sort_terms()
+        start = bisect.bisect_left(self._sorted_terms, token)
+        for term in self._sorted_terms[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                matches[term] = 2.0 + len(token) / len(term)
+
+        if len(token) >= MIN_FUZZY_LENGTH and token.isalpha():
+            if sum(len(self._term_docs[term]) for term in matches) < limit:
+                for term, similarity in self._similar_terms(token).items():
+                    matches.setdefault(term, similarity)
+        return matches
+
+    def _similar_terms(self, token: str) -> Dict[str, float]:
+        grams = _trigrams(token)
+        size = len(grams)
+        required = math.ceil(MIN_SIMILARITY * size)
+        postings = sorted((self._trigram_terms.get(trigram, set()) for trigram in grams), key=len)
+        cut = size - required + 1
+        counts = Counter()
+        for posting in postings[:cut]:
+            counts.update(posting)
+        rest = postings[cut:]
+        floor = next(
+            (
+                count for count in range(1, cut + 1)
+                if count + len(rest) >= MIN_SIMILARITY * (size + max(MIN_FUZZY_TERM_GRAMS, count + len(rest)) - count - len(rest))
+            ),
+            cut + 1
+        )
+
+        similar = {}
+        for term, count in counts.items():
+            if count < floor:
+                continue
+            term_size = self._term_grams[term]
+            if term_size < MIN_FUZZY_TERM_GRAMS:
+                continue
+            bound = min(count + len(rest), term_size)
+            if bound < MIN_SIMILARITY * (size + term_size - bound):
+                continue
+            overlap = count + sum(1 for posting in rest if term in posting)
+            similarity = overlap / (size + term_size - overlap)
+            if similarity >= MIN_SIMILARITY:
+                similar[term] = similarity
+        return similar
+
+
+class SearchIndexer:
+    def __init__(self):
+        self.index: Optional[CustomerSearchIndex] = None
+        self.last_error: Optional[str] = None
+        self._seq = 0
+        self._rebuilt_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, Dict[str, Any]]]:
+        return self.index.search(query, limit) if self.index is not None else []
+
+    async def refresh(self) -> None:
+        full = (settings.mirror_enabled and mirror_store.ready) or not settings.webhook_secret
+        stale = time.monotonic() - self._rebuilt_at >= settings.search_refresh_interval
+        if self.index is None or (full and stale):
+            await self.rebuild()
+        else:
+            await self.apply_changes()
+
+    async def rebuild(self) -> None:
+        seq = change_log.last_seq
+        index = CustomerSearchIndex()
+        count = 0
+        async for customer in self._customers():
+            index.add(map_customer(customer))
+            count += 1
+            if count % 1000 == 0:
+                await asyncio.sleep(0)
+        index.sort_terms()
+        self.index = index
+        self._seq = seq
+        self._rebuilt_at = time.monotonic()
+
+    async def apply_changes(self) -> None:
+        changes, reset = change_log.since(self._seq, limit=settings.changes_max_entries)
+        if reset:
+            logger.info("Change log no longer covers seq %s, rebuilding search index", self._seq)
+            await self.rebuild()
+            return
+        if not changes:
+            return
+
+        ids = sorted({change.id for change in changes if change.entity == "customer"})
+        for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+            batch = ids[start:start + UPDATE_BATCH_SIZE]
+            result = await retailcrm_service.get_customers_by_ids(batch)
+            if not result.get("success"):
+                raise RetailCRMError(result.get("errorMsg", "Failed to fetch changed customers"))
+            found = set()
+            for customer in result.get("customers", []):
+                self.index.add(map_customer(customer))
+                found.add(customer["id"])
+            for customer_id in batch:
+                if customer_id not in found:
+                    self.index.remove(customer_id)
+        self._seq = changes[-1].seq
+
+    async def _customers(self) -> AsyncIterator[Dict[str, Any]]:
+        if settings.mirror_enabled and mirror_store.ready:
+            async for customer in mirror_store.iter_customers():
+                yield customer
+        else:
+            async for customer in retailcrm_service.iter_customers():
+                yield customer
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                logger.exception("Search index refresh failed")
+                await asyncio.sleep(settings.search_refresh_interval)
+                continue
+            remaining = self._rebuilt_at + settings.search_refresh_interval - time.monotonic()
+            await change_log.wait(self._seq, remaining if remaining > 0 else settings.search_refresh_interval)
+
+
+search_indexer = SearchIndexer()
@@ -0,0 +1,67 @@
+import logging
+from typing import Any, Optional
+from fastapi import FastAPI
+from app.config import settings
+from app.logging_config import redact
+
+logger = logging.getLogger(__name__)
+
+REDACTED_ATTRIBUTES = ("http.url", "url.full", "http.target", "url.query")
+
+_provider: Optional[Any] = None
+
+
+def _redact_span(span: Any, *args: Any) -> None:
+    if span is None or not span.is_recording():
+        return
+    attributes = getattr(span, "attributes", None) or {}
+    for key in REDACTED_ATTRIBUTES:
+        if key in attributes:
+            span.set_attribute(key, redact(attributes[key]))
+
+
+async def _redact_span_async(span: Any, *args: Any) -> None:
+    _redact_span(span)
+
+
+def _json_line(span: Any) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+def setup_tracing(app: FastAPI) -> None:
+    global _provider
+    if not settings.tracing_enabled:
+        return
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logger.warning("Tracing is enabled but the OpenTelemetry packages are not installed")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing_service_name}))
+    if settings.tracing_otlp_endpoint:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)))
+    if settings.tracing_file:
+        output = open(settings.tracing_file, "a", encoding="utf-8")
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(out=output, formatter=_json_line)))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+
+    HTTPXClientInstrumentor().instrument(request_hook=_redact_span, async_request_hook=_redact_span_async)
+    FastAPIInstrumentor.instrument_app(
+        app,
+        excluded_urls="health,metrics",
+        server_request_hook=_redact_span
+    )
+
+
+def shutdown_tracing() -> None:
+    if _provider is not None:
+        _provider.shutdown()
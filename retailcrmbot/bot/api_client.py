@@ -0,0 +1,87 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class APIError(Exception):
+    def __init__(self, status: int, detail: Any):
+        super().__init__(f"{status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class APIClient:
+    def __init__(self, base_url: str, timeout: float = 10.0, max_connections: int = 100):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                headers={
+                    "Accept": "application/json",
+                    "User-Agent": "RetailCRM-Bot/1.0"
+                }
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        url = f"{self.base_url}{path}"
+        async with self.session.request(method, url, **kwargs) as resp:
+            logger.debug("%s %s params=%s -> %s", method, url, kwargs.get("params"), resp.status)
+            
+            if resp.status >= 400:
+                text = await resp.text()
+                try:
+                    detail = json.loads(text).get("detail", text)
+                except (ValueError, AttributeError):
+                    detail = text
+                logger.warning("%s %s -> %s: %s", method, url, resp.status, text[:200])
+                raise APIError(resp.status, detail)
+            
+            return await resp.json(content_type=None)
+    
+    async def get_customers(
+        self,
+        page: int = 1,
+        limit: int = 20,
+        filters: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"page": page, "limit": limit}
+        for key, value in (filters or {}).items():
+            if value:
+                params[key] = value
+        return await self._request("GET", "/customers", params=params)
+    
+    async def search_customers(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return await self._request("GET", "/customers/search", params={"q": q, "limit": limit})
+    
+    async def create_customer(self, customer_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._request("POST", "/customers", json=customer_data)
+    
+    async def get_customer_orders(self, customer_id: int, page: int = 1, limit: int = 20) -> Dict[str, Any]:
+        params = {"page": page, "limit": limit}
+        return await self._request("GET", f"/customers/{customer_id}/orders", params=params)
+    
+    async def create_order(self, customer_id: int, items: List[Dict[str, Any]], number: Optional[str] = None) -> Dict[str, Any]:
+        order_data: Dict[str, Any] = {"customer_id": customer_id, "items": items}
+        if number:
+            order_data["number"] = number
+        return await self._request("POST", "/orders", json=order_data)
+    
+    async def create_payment(self, order_id: int, payment_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._request("POST", f"/orders/{order_id}/payment", json=payment_data)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from os import getenv
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,12 +10,66 @@ load_dotenv()
 class Config:
     bot_token: str
     api_url: str
+    api_timeout: float = 10.0
+    api_max_connections: int = 100
+    log_level: str = "INFO"
+    mode: str = "polling"
+    webhook_url: Optional[str] = None
+    webhook_path: str = "/webhook"
+    webhook_secret: Optional[str] = None
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_max_connections: int = 40
+    update_workers: int = 16
+    update_queue_size: int = 1000
+    drain_timeout: float = 30.0
+    fsm_storage: str = "sqlite"
+    fsm_db_path: str = "data/fsm.db"
+    fsm_ttl: float = 86400.0
+    redis_url: str = "redis://localhost:6379/0"
+    prefetch_ttl: float = 60.0
+    prefetch_max_chats: int = 1000
+    inline_cache_ttl: float = 30.0
+    inline_debounce: float = 0.3
+    inline_budget: float = 1.5
+    inline_limit: int = 20
+    tracing_enabled: bool = False
+    tracing_service_name: str = "retailcrm-bot"
+    tracing_otlp_endpoint: Optional[str] = None
+    tracing_file: Optional[str] = None
 
 
 def load_config() -> Config:
     return Config(
         bot_token=getenv("BOT_TOKEN"),
-        api_url=getenv("API_URL")
+        api_url=getenv("API_URL"),
+        api_timeout=float(getenv("API_TIMEOUT", "10")),
+        api_max_connections=int(getenv("API_MAX_CONNECTIONS", "100")),
+        log_level=getenv("LOG_LEVEL", "INFO"),
+        mode=getenv("BOT_MODE", "polling").lower(),
+        webhook_url=getenv("WEBHOOK_URL") or None,
+        webhook_path=getenv("WEBHOOK_PATH", "/webhook"),
+        webhook_secret=getenv("WEBHOOK_SECRET") or None,
+        webhook_host=getenv("WEBHOOK_HOST", "0.0.0.0"),
+        webhook_port=int(getenv("WEBHOOK_PORT", "8080")),
+        webhook_max_connections=int(getenv("WEBHOOK_MAX_CONNECTIONS", "40")),
+        update_workers=int(getenv("UPDATE_WORKERS", "16")),
+        update_queue_size=int(getenv("UPDATE_QUEUE_SIZE", "1000")),
+        drain_timeout=float(getenv("DRAIN_TIMEOUT", "30")),
+        fsm_storage=getenv("FSM_STORAGE", "sqlite").lower(),
+        fsm_db_path=getenv("FSM_DB_PATH", "data/fsm.db"),
+        fsm_ttl=float(getenv("FSM_TTL", "86400")),
+        redis_url=getenv("REDIS_URL", "redis://localhost:6379/0"),
+        prefetch_ttl=float(getenv("PREFETCH_TTL", "60")),
+        prefetch_max_chats=int(getenv("PREFETCH_MAX_CHATS", "1000")),
+        inline_cache_ttl=float(getenv("INLINE_CACHE_TTL", "30")),
+        inline_debounce=float(getenv("INLINE_DEBOUNCE", "0.3")),
+        inline_budget=float(getenv("INLINE_BUDGET", "1.5")),
+        inline_limit=int(getenv("INLINE_LIMIT", "20")),
+        tracing_enabled=getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes"),
+        tracing_service_name=getenv("TRACING_SERVICE_NAME", "retailcrm-bot"),
+        tracing_otlp_endpoint=getenv("TRACING_OTLP_ENDPOINT") or None,
+        tracing_file=getenv("TRACING_FILE") or None
     )
 
 
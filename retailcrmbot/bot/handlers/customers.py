@@ -1,90 +1,77 @@
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
-import aiohttp
+import logging
 
-from bot.config import config
+from bot.api_client import APIClient, APIError
+from bot.prefetch import PagePrefetcher
 from bot.states import CustomerStates, CustomerFilterStates
 from bot.keyboards import get_pagination_keyboard, get_skip_button, get_cancel_button, get_customers_menu
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 
 @router.callback_query(F.data == "customers_list")
-async def customers_list(callback: CallbackQuery, state: FSMContext):
+async def customers_list(callback: CallbackQuery, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     await callback.answer()
-    await show_customers_page(callback.message, 1, state)
-
-
-async def show_customers_page(message: Message, page: int, state: FSMContext, filters: dict = None):
-    async with aiohttp.ClientSession() as session:
-        params = {"page": page, "limit": 20}
+    await state.update_data(filters=None)
+    await show_customers_page(callback.message, 1, state, api, pages)
+
+
+async def show_customers_page(
+    message: Message,
+    page: int,
+    state: FSMContext,
+    api: APIClient,
+    pages: PagePrefetcher,
+    filters: dict = None
+):
+    try:
+        data = await pages.get(
+            message.chat.id,
+            ["customers", filters],
+            page,
+            lambda number: api.get_customers(page=number, limit=20, filters=filters)
+        )
+        customers = data["items"]
         
-        if filters:
-            if filters.get("first_name"):
-                params["first_name"] = filters["first_name"]
-            if filters.get("last_name"):
-                params["last_name"] = filters["last_name"]
-            if filters.get("email"):
-                params["email"] = filters["email"]
+        if not customers:
+            await message.edit_text("Клиенты не найдены")
+            return
         
-        url = f"{config.api_url}/customers"
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "RetailCRM-Bot/1.0"
-        }
+        total_pages = data["total_pages"]
+        text = f"Список клиентов (страница {page} из {total_pages}, всего {data['total_count']}):\n\n"
         
-        print(f"DEBUG BOT: Requesting URL: {url}")
-        print(f"DEBUG BOT: Params: {params}")
+        for customer in customers:
+            text += f"ID: {customer['id']}\n"
+            text += f"Имя: {customer.get('first_name', 'Не указано')}\n"
+            text += f"Фамилия: {customer.get('last_name', 'Не указано')}\n"
+            text += f"Email: {customer.get('email', 'Не указано')}\n"
+            text += f"Телефон: {customer.get('phone', 'Не указано')}\n"
+            text += f"Создан: {customer.get('created_at', 'Не указано')}\n"
+            text += "\n"
         
-        try:
-            async with session.get(url, params=params, headers=headers) as resp:
-                print(f"DEBUG BOT: Response status: {resp.status}")
-                response_text = await resp.text()
-                print(f"DEBUG BOT: Response text: {response_text[:500]}")
-                
-                if resp.status == 200:
-                    customers = await resp.json()
-                    
-                    if not customers:
-                        await message.edit_text("Клиенты не найдены")
-                        return
-                    
-                    text = f"Список клиентов (страница {page}):\n\n"
-                    
-                    for customer in customers:
-                        text += f"ID: {customer['id']}\n"
-                        text += f"Имя: {customer.get('first_name', 'Не указано')}\n"
-                        text += f"Фамилия: {customer.get('last_name', 'Не указано')}\n"
-                        text += f"Email: {customer.get('email', 'Не указано')}\n"
-                        text += f"Телефон: {customer.get('phone', 'Не указано')}\n"
-                        text += f"Создан: {customer.get('created_at', 'Не указано')}\n"
-                        text += "\n"
-                    
-                    total_pages = page + 1 if len(customers) == 10 else page
-                    
-                    await message.edit_text(
-                        text,
-                        reply_markup=get_pagination_keyboard(page, total_pages, "customers_list")
-                    )
-                else:
-                    await message.edit_text(f"Ошибка при получении данных: {resp.status}\n{response_text[:200]}")
-        except Exception as e:
-            import traceback
-            print(f"DEBUG BOT: Exception: {str(e)}")
-            print(f"DEBUG BOT: Traceback: {traceback.format_exc()}")
-            await message.edit_text(f"Ошибка: {str(e)}")
+        await message.edit_text(
+            text,
+            reply_markup=get_pagination_keyboard(page, total_pages, "customers_list")
+        )
+    except APIError as e:
+        await message.edit_text(f"Ошибка при получении данных: {e.status}\n{str(e.detail)[:200]}")
+    except Exception as e:
+        logger.exception("Failed to load customers page")
+        await message.edit_text(f"Ошибка: {str(e)}")
 
 
 @router.callback_query(F.data.startswith("customers_list_page_"))
-async def customers_page_handler(callback: CallbackQuery, state: FSMContext):
+async def customers_page_handler(callback: CallbackQuery, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     await callback.answer()
     page = int(callback.data.split("_")[-1])
     
     data = await state.get_data()
     filters = data.get("filters")
     
-    await show_customers_page(callback.message, page, state, filters)
+    await show_customers_page(callback.message, page, state, api, pages, filters)
 
 
 @router.callback_query(F.data == "customers_filter")
@@ -140,7 +127,7 @@ async def process_filter_last_name(message: Message, state: FSMContext):
 
 
 @router.callback_query(F.data == "skip_email")
-async def skip_email(callback: CallbackQuery, state: FSMContext):
+async def skip_email(callback: CallbackQuery, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     await callback.answer()
     data = await state.get_data()
     filters = {
@@ -148,26 +135,26 @@ async def skip_email(callback: CallbackQuery, state: FSMContext):
         "last_name": data.get("last_name"),
         "email": None
     }
-    await state.update_data(filters=filters)
-    await state.clear()
+    await state.set_state(None)
+    await state.set_data({"filters": filters})
     
     msg = await callback.message.edit_text("Поиск клиентов...")
-    await show_customers_page(msg, 1, state, filters)
+    await show_customers_page(msg, 1, state, api, pages, filters)
 
 
 @router.message(CustomerFilterStates.waiting_email)
-async def process_filter_email(message: Message, state: FSMContext):
+async def process_filter_email(message: Message, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     data = await state.get_data()
     filters = {
         "first_name": data.get("first_name"),
         "last_name": data.get("last_name"),
         "email": message.text
     }
-    await state.update_data(filters=filters)
-    await state.clear()
+    await state.set_state(None)
+    await state.set_data({"filters": filters})
     
     msg = await message.answer("Поиск клиентов...")
-    await show_customers_page(msg, 1, state, filters)
+    await show_customers_page(msg, 1, state, api, pages, filters)
 
 
 @router.callback_query(F.data == "customers_create")
@@ -234,17 +221,23 @@ async def process_email(message: Message, state: FSMContext):
 
 
 @router.callback_query(F.data == "skip_phone_create")
-async def skip_phone_create(callback: CallbackQuery, state: FSMContext):
+async def skip_phone_create(callback: CallbackQuery, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     await callback.answer()
-    await create_customer_request(callback.message, state, phone=None)
+    await create_customer_request(callback.message, state, api, pages, phone=None)
 
 
 @router.message(CustomerStates.waiting_phone)
-async def process_phone(message: Message, state: FSMContext):
-    await create_customer_request(message, state, phone=message.text)
+async def process_phone(message: Message, state: FSMContext, api: APIClient, pages: PagePrefetcher):
+    await create_customer_request(message, state, api, pages, phone=message.text)
 
 
-async def create_customer_request(message: Message, state: FSMContext, phone: str = None):
+async def create_customer_request(
+    message: Message,
+    state: FSMContext,
+    api: APIClient,
+    pages: PagePrefetcher,
+    phone: str = None
+):
     data = await state.get_data()
     
     customer_data = {
@@ -258,22 +251,23 @@ async def create_customer_request(message: Message, state: FSMContext, phone: st
     if phone:
         customer_data["phone"] = phone
     
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(f"{config.api_url}/customers", json=customer_data) as resp:
-                result = await resp.json()
-                
-                if resp.status == 200 and result.get("success"):
-                    await state.clear()
-                    await message.answer(
-                        f"Клиент успешно создан\n"
-                        f"ID: {result.get('id')}\n\n"
-                        "Возвращайтесь в главное меню",
-                        reply_markup=get_customers_menu()
-                    )
-                else:
-                    await message.answer(
-                        f"Ошибка при создании клиента:\n{result.get('detail', 'Неизвестная ошибка')}"
-                    )
-        except Exception as e:
-            await message.answer(f"Ошибка: {str(e)}")
\ No newline at end of file
+    try:
+        result = await api.create_customer(customer_data)
+        
+        if result.get("success"):
+            pages.invalidate(message.chat.id)
+            await state.clear()
+            await message.answer(
+                f"Клиент успешно создан\n"
+                f"ID: {result.get('id')}\n\n"
+                "Возвращайтесь в главное меню",
+                reply_markup=get_customers_menu()
+            )
+        else:
+            await message.answer(
+                f"Ошибка при создании клиента:\n{result.get('detail', 'Неизвестная ошибка')}"
+            )
+    except APIError as e:
+        await message.answer(f"Ошибка при создании клиента:\n{e.detail}")
+    except Exception as e:
+        await message.answer(f"Ошибка: {str(e)}")
\ No newline at end of file
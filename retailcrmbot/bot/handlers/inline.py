@@ -0,0 +1,57 @@
+from aiogram import Router
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+import logging
+
+from bot.api_client import APIClient
+from bot.inline_search import InlineSearch
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+MIN_QUERY_LENGTH = 2
+
+
+def customer_result(customer: dict) -> InlineQueryResultArticle:
+    name = " ".join(part for part in (customer.get("first_name"), customer.get("last_name")) if part)
+    contacts = " · ".join(part for part in (customer.get("phone"), customer.get("email")) if part)
+    
+    text = f"ID: {customer['id']}\n"
+    text += f"Имя: {customer.get('first_name') or 'Не указано'}\n"
+    text += f"Фамилия: {customer.get('last_name') or 'Не указано'}\n"
+    text += f"Email: {customer.get('email') or 'Не указано'}\n"
+    text += f"Телефон: {customer.get('phone') or 'Не указано'}\n"
+    text += f"Создан: {customer.get('created_at') or 'Не указано'}"
+    
+    return InlineQueryResultArticle(
+        id=str(customer["id"]),
+        title=name or f"Клиент {customer['id']}",
+        description=contacts or f"ID: {customer['id']}",
+        input_message_content=InputTextMessageContent(message_text=text)
+    )
+
+
+@router.inline_query()
+async def inline_customer_search(inline_query: InlineQuery, api: APIClient, search: InlineSearch):
+    query = inline_query.query.strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        await inline_query.answer([], cache_time=5, is_personal=True)
+        return
+    
+    try:
+        customers = await search.search(
+            inline_query.from_user.id,
+            query,
+            lambda q, limit: api.search_customers(q, limit=limit)
+        )
+    except Exception:
+        logger.exception("Inline customer search failed")
+        await inline_query.answer([], cache_time=0, is_personal=True)
+        return
+    
+    if customers is None:
+        return
+    
+    await inline_query.answer(
+        [customer_result(customer) for customer in customers],
+        cache_time=int(search.ttl) if customers else 0
+    )
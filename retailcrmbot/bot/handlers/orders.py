@@ -1,9 +1,9 @@
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
-import aiohttp
 
-from bot.config import config
+from bot.api_client import APIClient, APIError
+from bot.prefetch import PagePrefetcher
 from bot.states import OrderStates, PaymentStates
 from bot.keyboards import get_pagination_keyboard, get_skip_button, get_cancel_button, get_orders_menu
 
@@ -21,58 +21,64 @@ async def orders_by_customer_start(callback: CallbackQuery, state: FSMContext):
 
 
 @router.message(OrderStates.waiting_customer_id)
-async def process_customer_id_for_orders(message: Message, state: FSMContext):
+async def process_customer_id_for_orders(message: Message, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     try:
         customer_id = int(message.text)
         await state.update_data(customer_id=customer_id)
         await state.clear()
         
         msg = await message.answer("Загрузка заказов...")
-        await show_orders_page(msg, customer_id, 1, state)
+        await show_orders_page(msg, customer_id, 1, state, api, pages)
     except ValueError:
         await message.answer("ID клиента должен быть числом. Попробуйте снова:")
 
 
-async def show_orders_page(message: Message, customer_id: int, page: int, state: FSMContext):
-    async with aiohttp.ClientSession() as session:
-        params = {"page": page, "limit": 20}
+async def show_orders_page(
+    message: Message,
+    customer_id: int,
+    page: int,
+    state: FSMContext,
+    api: APIClient,
+    pages: PagePrefetcher
+):
+    try:
+        data = await pages.get(
+            message.chat.id,
+            ["orders", customer_id],
+            page,
+            lambda number: api.get_customer_orders(customer_id, page=number, limit=20)
+        )
+        orders = data["items"]
+        
+        if not orders:
+            await message.edit_text("Заказы не найдены")
+            return
+        
+        total_pages = data["total_pages"]
+        text = f"Заказы клиента {customer_id} (страница {page} из {total_pages}, всего {data['total_count']}):\n\n"
+        
+        for order in orders:
+            text += f"ID: {order['id']}\n"
+            text += f"Номер: {order.get('number', 'Не указан')}\n"
+            text += f"Статус: {order.get('status', 'Не указан')}\n"
+            text += f"Сумма: {order.get('total_sum', 0)}\n"
+            text += f"Создан: {order.get('created_at', 'Не указано')}\n"
+            text += "\n"
+        
+        await state.update_data(orders_customer_id=customer_id)
         
-        try:
-            async with session.get(f"{config.api_url}/customers/{customer_id}/orders", params=params) as resp:
-                if resp.status == 200:
-                    orders = await resp.json()
-                    
-                    if not orders:
-                        await message.edit_text("Заказы не найдены")
-                        return
-                    
-                    text = f"Заказы клиента {customer_id} (страница {page}):\n\n"
-                    
-                    for order in orders:
-                        text += f"ID: {order['id']}\n"
-                        text += f"Номер: {order.get('number', 'Не указан')}\n"
-                        text += f"Статус: {order.get('status', 'Не указан')}\n"
-                        text += f"Сумма: {order.get('total_sum', 0)}\n"
-                        text += f"Создан: {order.get('created_at', 'Не указано')}\n"
-                        text += "\n"
-                    
-                    total_pages = page + 1 if len(orders) == 10 else page
-                    
-                    await state.update_data(orders_customer_id=customer_id)
-                    
-                    await message.edit_text(
-                        text,
-                        reply_markup=get_pagination_keyboard(page, total_pages, "orders_list")
-                    )
-                else:
-                    error_data = await resp.json()
-                    await message.edit_text(f"Ошибка при получении данных: {error_data.get('detail', resp.status)}")
-        except Exception as e:
-            await message.edit_text(f"Ошибка: {str(e)}")
+        await message.edit_text(
+            text,
+            reply_markup=get_pagination_keyboard(page, total_pages, "orders_list")
+        )
+    except APIError as e:
+        await message.edit_text(f"Ошибка при получении данных: {e.detail}")
+    except Exception as e:
+        await message.edit_text(f"Ошибка: {str(e)}")
 
 
 @router.callback_query(F.data.startswith("orders_list_page_"))
-async def orders_page_handler(callback: CallbackQuery, state: FSMContext):
+async def orders_page_handler(callback: CallbackQuery, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     await callback.answer()
     page = int(callback.data.split("_")[-1])
     
@@ -80,7 +86,7 @@ async def orders_page_handler(callback: CallbackQuery, state: FSMContext):
     customer_id = data.get("orders_customer_id")
     
     if customer_id:
-        await show_orders_page(callback.message, customer_id, page, state)
+        await show_orders_page(callback.message, customer_id, page, state, api, pages)
 
 
 @router.callback_query(F.data == "orders_create")
@@ -140,7 +146,7 @@ async def process_order_number(message: Message, state: FSMContext):
 
 
 @router.message(OrderStates.waiting_items)
-async def process_order_items(message: Message, state: FSMContext):
+async def process_order_items(message: Message, state: FSMContext, api: APIClient, pages: PagePrefetcher):
     try:
         lines = message.text.strip().split('\n')
         items = []
@@ -167,30 +173,23 @@ async def process_order_items(message: Message, state: FSMContext):
         
         data = await state.get_data()
         
-        order_data = {
-            "customer_id": data["customer_id"],
-            "items": items
-        }
-        
-        if data.get("number"):
-            order_data["number"] = data["number"]
+        result = await api.create_order(data["customer_id"], items, number=data.get("number"))
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{config.api_url}/orders", json=order_data) as resp:
-                result = await resp.json()
-                
-                if resp.status == 200 and result.get("success"):
-                    await state.clear()
-                    await message.answer(
-                        f"Заказ успешно создан\n"
-                        f"ID: {result.get('id')}\n\n"
-                        "Возвращайтесь в главное меню",
-                        reply_markup=get_orders_menu()
-                    )
-                else:
-                    await message.answer(
-                        f"Ошибка при создании заказа:\n{result.get('detail', 'Неизвестная ошибка')}"
-                    )
+        if result.get("success"):
+            pages.invalidate(message.chat.id)
+            await state.clear()
+            await message.answer(
+                f"Заказ успешно создан\n"
+                f"ID: {result.get('id')}\n\n"
+                "Возвращайтесь в главное меню",
+                reply_markup=get_orders_menu()
+            )
+        else:
+            await message.answer(
+                f"Ошибка при создании заказа:\n{result.get('detail', 'Неизвестная ошибка')}"
+            )
+    except APIError as e:
+        await message.answer(f"Ошибка при создании заказа:\n{e.detail}")
     except ValueError:
         await message.answer(
             "Ошибка в данных. Проверьте что количество и цена - числа.\n"
@@ -240,17 +239,17 @@ async def process_payment_amount(message: Message, state: FSMContext):
 
 
 @router.callback_query(F.data == "skip_payment_type")
-async def skip_payment_type(callback: CallbackQuery, state: FSMContext):
+async def skip_payment_type(callback: CallbackQuery, state: FSMContext, api: APIClient):
     await callback.answer()
-    await create_payment_request(callback.message, state, payment_type="cash")
+    await create_payment_request(callback.message, state, api, payment_type="cash")
 
 
 @router.message(PaymentStates.waiting_type)
-async def process_payment_type(message: Message, state: FSMContext):
-    await create_payment_request(message, state, payment_type=message.text)
+async def process_payment_type(message: Message, state: FSMContext, api: APIClient):
+    await create_payment_request(message, state, api, payment_type=message.text)
 
 
-async def create_payment_request(message: Message, state: FSMContext, payment_type: str):
+async def create_payment_request(message: Message, state: FSMContext, api: APIClient, payment_type: str):
     data = await state.get_data()
     
     payment_data = {
@@ -259,25 +258,22 @@ async def create_payment_request(message: Message, state: FSMContext, payment_ty
         "status": "paid"
     }
     
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(
-                f"{config.api_url}/orders/{data['order_id']}/payment",
-                json=payment_data
-            ) as resp:
-                result = await resp.json()
-                
-                if resp.status == 200 and result.get("success"):
-                    await state.clear()
-                    await message.answer(
-                        f"Платеж успешно создан\n"
-                        f"ID: {result.get('id')}\n\n"
-                        "Возвращайтесь в главное меню",
-                        reply_markup=get_orders_menu()
-                    )
-                else:
-                    await message.answer(
-                        f"Ошибка при создании платежа:\n{result.get('detail', 'Неизвестная ошибка')}"
-                    )
-        except Exception as e:
-            await message.answer(f"Ошибка: {str(e)}")
\ No newline at end of file
+    try:
+        result = await api.create_payment(data["order_id"], payment_data)
+        
+        if result.get("success"):
+            await state.clear()
+            await message.answer(
+                f"Платеж успешно создан\n"
+                f"ID: {result.get('id')}\n\n"
+                "Возвращайтесь в главное меню",
+                reply_markup=get_orders_menu()
+            )
+        else:
+            await message.answer(
+                f"Ошибка при создании платежа:\n{result.get('detail', 'Неизвестная ошибка')}"
+            )
+    except APIError as e:
+        await message.answer(f"Ошибка при создании платежа:\n{e.detail}")
+    except Exception as e:
+        await message.answer(f"Ошибка: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SearchFetch = Callable[[str, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class InlineSearch:
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        debounce: float = 0.3,
+        budget: float = 1.5,
+        limit: int = 20,
+        maxsize: int = 1024
+    ):
+        self.ttl = ttl
+        self.debounce = debounce
+        self.budget = budget
+        self.limit = limit
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[int, int] = {}
+    
+    def _store(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.debug("Customer search for %r failed: %s", key, task.exception())
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, task.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+    
+    def _fetch(self, key: str, fetch: SearchFetch) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch(key, self.limit))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+        return task
+    
+    async def search(self, user_id: int, query: str, fetch: SearchFetch) -> Optional[List[Dict[str, Any]]]:
+        key = normalize_query(query)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            return cached[1]
+        
+        token = self._latest.get(user_id, 0) + 1
+        self._latest[user_id] = token
+        try:
+            await asyncio.sleep(self.debounce)
+            if self._latest.get(user_id) != token:
+                return None
+            
+            try:
+                return await asyncio.wait_for(asyncio.shield(self._fetch(key, fetch)), self.budget)
+            except asyncio.TimeoutError:
+                logger.info("Customer search for %r exceeded %.1fs budget", key, self.budget)
+                cached = self._cache.get(key)
+                return cached[1] if cached is not None else []
+        finally:
+            if self._latest.get(user_id) == token:
+                del self._latest[user_id]
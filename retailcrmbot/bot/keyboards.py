@@ -39,6 +39,12 @@ def get_orders_menu():
 def get_pagination_keyboard(current_page: int, total_pages: int, callback_prefix: str):
     buttons = []
     
+    if current_page > 2:
+        buttons.append(InlineKeyboardButton(
+            text="<<",
+            callback_data=f"{callback_prefix}_page_1"
+        ))
+    
     if current_page > 1:
         buttons.append(InlineKeyboardButton(
             text="Назад",
@@ -56,6 +62,12 @@ def get_pagination_keyboard(current_page: int, total_pages: int, callback_prefix
             callback_data=f"{callback_prefix}_page_{current_page + 1}"
         ))
     
+    if current_page < total_pages - 1:
+        buttons.append(InlineKeyboardButton(
+            text=">>",
+            callback_data=f"{callback_prefix}_page_{total_pages}"
+        ))
+    
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         buttons,
         [InlineKeyboardButton(text="Назад в меню", callback_data="back_main")]
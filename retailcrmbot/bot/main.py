@@ -1,14 +1,28 @@
 import asyncio
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 
+from bot.api_client import APIClient
 from bot.config import config
-from bot.handlers import start, customers, orders
+from bot.handlers import start, customers, orders, inline
+from bot.inline_search import InlineSearch
+from bot.prefetch import PagePrefetcher
+from bot.storage import create_storage
+from bot.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from bot.webhook import run_webhook
+
+log_queue = queue.SimpleQueue()
+log_output = logging.StreamHandler()
+log_output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, log_output)
+log_handler = QueueHandler(log_queue)
+log_handler.setFormatter(logging.Formatter('%(message)s'))
 
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=config.log_level.upper(),
+    handlers=[log_handler]
 )
 
 logger = logging.getLogger(__name__)
@@ -16,23 +30,47 @@ logger = logging.getLogger(__name__)
 
 async def main():
     bot = Bot(token=config.bot_token)
-    storage = MemoryStorage()
+    storage = create_storage(config)
     dp = Dispatcher(storage=storage)
     
+    if setup_tracing(config):
+        dp.update.outer_middleware(TracingMiddleware())
+    
+    api = APIClient(config.api_url, timeout=config.api_timeout, max_connections=config.api_max_connections)
+    pages = PagePrefetcher(ttl=config.prefetch_ttl, max_chats=config.prefetch_max_chats)
+    dp["api"] = api
+    dp["pages"] = pages
+    dp["search"] = InlineSearch(
+        ttl=config.inline_cache_ttl,
+        debounce=config.inline_debounce,
+        budget=config.inline_budget,
+        limit=config.inline_limit
+    )
+    
     dp.include_router(start.router)
     dp.include_router(customers.router)
     dp.include_router(orders.router)
+    dp.include_router(inline.router)
     
     logger.info("Bot started")
     
     try:
-        await dp.start_polling(bot)
+        if config.mode == "webhook":
+            await run_webhook(dp, bot, config)
+        else:
+            await dp.start_polling(bot)
     finally:
+        pages.invalidate()
+        await api.close()
         await bot.session.close()
+        shutdown_tracing()
 
 
 if __name__ == "__main__":
+    log_listener.start()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        logger.info("Bot stopped")
\ No newline at end of file
+        logger.info("Bot stopped")
+    finally:
+        log_listener.stop()
\ No newline at end of file
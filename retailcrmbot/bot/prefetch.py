@@ -0,0 +1,88 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PageFetch = Callable[[int], Awaitable[Dict[str, Any]]]
+
+
+class PagePrefetcher:
+    def __init__(self, ttl: float = 60.0, max_chats: int = 1000):
+        self.ttl = ttl
+        self.max_chats = max_chats
+        self._chats: "OrderedDict[int, Tuple[str, Dict[int, Tuple[float, asyncio.Task]]]]" = OrderedDict()
+    
+    def _pages(self, chat_id: int, query: str) -> Dict[int, Tuple[float, asyncio.Task]]:
+        entry = self._chats.get(chat_id)
+        if entry is None or entry[0] != query:
+            if entry is not None:
+                self._cancel(entry[1])
+            entry = (query, {})
+            self._chats[chat_id] = entry
+        self._chats.move_to_end(chat_id)
+        while len(self._chats) > self.max_chats:
+            _, (_, evicted) = self._chats.popitem(last=False)
+            self._cancel(evicted)
+        return entry[1]
+    
+    def _cancel(self, pages: Dict[int, Tuple[float, asyncio.Task]]) -> None:
+        for _, task in pages.values():
+            if not task.done():
+                task.cancel()
+        pages.clear()
+    
+    def _start(self, pages: Dict[int, Tuple[float, asyncio.Task]], page: int, fetch: PageFetch) -> asyncio.Task:
+        cached = pages.get(page)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        task = asyncio.ensure_future(fetch(page))
+        pages[page] = (time.monotonic() + self.ttl, task)
+        
+        def forget(done: asyncio.Task) -> None:
+            if done.cancelled() or done.exception() is not None:
+                if not done.cancelled():
+                    logger.debug("Fetching page %s failed: %s", page, done.exception())
+                if pages.get(page, (None, None))[1] is done:
+                    del pages[page]
+        
+        task.add_done_callback(forget)
+        return task
+    
+    async def get(self, chat_id: int, query: Any, page: int, fetch: PageFetch) -> Dict[str, Any]:
+        if self.ttl <= 0:
+            return await fetch(page)
+        
+        pages = self._pages(chat_id, json.dumps(query, sort_keys=True, default=str))
+        task = self._start(pages, page, fetch)
+        try:
+            data = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            data = await fetch(page)
+        if self._chats.get(chat_id, (None, None))[1] is not pages:
+            return data
+        
+        keep = {page - 1, page, page + 1}
+        for stale in [cached for cached in pages if cached not in keep]:
+            _, task = pages.pop(stale)
+            if not task.done():
+                task.cancel()
+        if page < data.get("total_pages", 0):
+            self._start(pages, page + 1, fetch)
+        return data
+    
+    def invalidate(self, chat_id: Optional[int] = None) -> None:
+        if chat_id is None:
+            for _, pages in self._chats.values():
+                self._cancel(pages)
+            self._chats.clear()
+            return
+        entry = self._chats.pop(chat_id, None)
+        if entry is not None:
+            self._cancel(entry[1])
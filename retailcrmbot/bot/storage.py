@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+)
+"""
+
+PURGE_INTERVAL = 60.0
+
+
+class SQLiteStorage(BaseStorage):
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl or None
+        self.key_builder = DefaultKeyBuilder(with_bot_id=True, with_business_connection_id=True, with_destiny=True)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._purged_at = 0.0
+    
+    def _open(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(SCHEMA)
+            self._connection.commit()
+        return self._connection
+    
+    async def _run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        def locked() -> Any:
+            with self._lock:
+                return fn(self._open())
+        
+        return await asyncio.to_thread(locked)
+    
+    def _read(self, db: sqlite3.Connection, key: str) -> Optional[tuple]:
+        row = db.execute("SELECT state, data, updated_at FROM fsm WHERE key = ?", (key,)).fetchone()
+        if row is not None and self.ttl is not None and row[2] < time.time() - self.ttl:
+            db.execute("DELETE FROM fsm WHERE key = ?", (key,))
+            db.commit()
+            return None
+        return row
+    
+    def _write(self, db: sqlite3.Connection, key: str, state: Optional[str], data: str) -> None:
+        now = time.time()
+        if state is None and data == "{}":
+            db.execute("DELETE FROM fsm WHERE key = ?", (key,))
+        else:
+            db.execute(
+                "INSERT INTO fsm (key, state, data, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET state = excluded.state, data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                (key, state, data, now)
+            )
+        if self.ttl is not None and now - self._purged_at >= PURGE_INTERVAL:
+            purged = db.execute("DELETE FROM fsm WHERE updated_at < ?", (now - self.ttl,)).rowcount
+            self._purged_at = now
+            if purged:
+                logger.info("Purged %d abandoned dialogs", purged)
+        db.commit()
+    
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        storage_key = self.key_builder.build(key)
+        
+        def run(db: sqlite3.Connection) -> None:
+            row = self._read(db, storage_key)
+            self._write(db, storage_key, value, row[1] if row is not None else "{}")
+        
+        await self._run(run)
+    
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        storage_key = self.key_builder.build(key)
+        row = await self._run(lambda db: self._read(db, storage_key))
+        return row[0] if row is not None else None
+    
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise ValueError(f"Data must be a dict, got {type(data).__name__}")
+        storage_key = self.key_builder.build(key)
+        payload = json.dumps(data, ensure_ascii=False)
+        
+        def run(db: sqlite3.Connection) -> None:
+            row = self._read(db, storage_key)
+            self._write(db, storage_key, row[0] if row is not None else None, payload)
+        
+        await self._run(run)
+    
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        storage_key = self.key_builder.build(key)
+        row = await self._run(lambda db: self._read(db, storage_key))
+        return json.loads(row[1]) if row is not None else {}
+    
+    async def close(self) -> None:
+        def run() -> None:
+            with self._lock:
+                if self._connection is not None:
+                    self._connection.close()
+                    self._connection = None
+        
+        await asyncio.to_thread(run)
+
+
+def create_storage(config: Config) -> BaseStorage:
+    ttl = config.fsm_ttl or None
+    if config.fsm_storage == "redis":
+        try:
+            from aiogram.fsm.storage.redis import RedisStorage
+        except ImportError:
+            raise RuntimeError("FSM_STORAGE=redis requires the redis package")
+        return RedisStorage.from_url(
+            config.redis_url,
+            state_ttl=int(ttl) if ttl else None,
+            data_ttl=int(ttl) if ttl else None
+        )
+    if config.fsm_storage == "sqlite":
+        return SQLiteStorage(config.fsm_db_path, ttl=ttl)
+    return MemoryStorage()
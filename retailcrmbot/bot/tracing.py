@@ -0,0 +1,75 @@
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.config import Config
+
+logger = logging.getLogger(__name__)
+
+_BOT_TOKEN = re.compile(r"/bot[^/]+/")
+
+_provider: Optional[Any] = None
+
+
+def _strip_token(url: Any) -> str:
+    return _BOT_TOKEN.sub("/bot***/", str(url))
+
+
+def _json_line(span: Any) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+def setup_tracing(config: Config) -> bool:
+    global _provider
+    if not config.tracing_enabled:
+        return False
+    
+    try:
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.aiohttp_client import AioHttpClientInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logger.warning("Tracing is enabled but the OpenTelemetry packages are not installed")
+        return False
+    
+    provider = TracerProvider(resource=Resource.create({"service.name": config.tracing_service_name}))
+    if config.tracing_otlp_endpoint:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=config.tracing_otlp_endpoint)))
+    if config.tracing_file:
+        output = open(config.tracing_file, "a", encoding="utf-8")
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(out=output, formatter=_json_line)))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    
+    AioHttpClientInstrumentor().instrument(url_filter=_strip_token)
+    return True
+
+
+def shutdown_tracing():
+    if _provider is not None:
+        _provider.shutdown()
+
+
+class TracingMiddleware(BaseMiddleware):
+    def __init__(self):
+        from opentelemetry import trace
+        self.tracer = trace.get_tracer("bot")
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        attributes = {"telegram.update_id": event.update_id, "telegram.event_type": event.event_type}
+        if event.callback_query is not None:
+            attributes["telegram.callback_data"] = event.callback_query.data or ""
+        
+        with self.tracer.start_as_current_span(f"telegram {event.event_type}", attributes=attributes):
+            return await handler(event, data)
@@ -0,0 +1,116 @@
+import asyncio
+import hmac
+import logging
+import signal
+from typing import List
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+from bot.config import Config
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdateWorkerPool:
+    def __init__(self, dp: Dispatcher, bot: Bot, workers: int, queue_size: int):
+        self.dp = dp
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    def submit(self, update: Update) -> bool:
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        return True
+    
+    async def _worker(self) -> None:
+        while True:
+            update = await self.queue.get()
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception:
+                logger.exception("Failed to process update %s", update.update_id)
+            finally:
+                self.queue.task_done()
+    
+    async def drain(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Drain timed out with %d updates still queued", self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def create_webhook_app(bot: Bot, pool: UpdateWorkerPool, config: Config) -> web.Application:
+    async def handle_update(request: web.Request) -> web.Response:
+        if config.webhook_secret and not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ""), config.webhook_secret
+        ):
+            return web.Response(status=401)
+        
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": bot})
+        except ValueError:
+            return web.Response(status=400)
+        
+        if not pool.submit(update):
+            logger.warning("Update queue is full, rejecting update %s", update.update_id)
+            return web.Response(status=503)
+        return web.Response()
+    
+    app = web.Application()
+    app.router.add_post(config.webhook_path, handle_update)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, config: Config) -> None:
+    if not config.webhook_url:
+        raise ValueError("WEBHOOK_URL is required when BOT_MODE=webhook")
+    
+    pool = UpdateWorkerPool(dp, bot, config.update_workers, config.update_queue_size)
+    runner = web.AppRunner(create_webhook_app(bot, pool, config))
+    await runner.setup()
+    site = web.TCPSite(runner, config.webhook_host, config.webhook_port)
+    
+    workflow_data = {"dispatcher": dp, "bot": bot, **dp.workflow_data}
+    await dp.emit_startup(**workflow_data)
+    pool.start()
+    await site.start()
+    
+    await bot.set_webhook(
+        f"{config.webhook_url.rstrip('/')}{config.webhook_path}",
+        secret_token=config.webhook_secret,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=config.webhook_max_connections
+    )
+    logger.info("Webhook listening on %s:%s%s", config.webhook_host, config.webhook_port, config.webhook_path)
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Stopping webhook intake, draining %d queued updates", pool.queue.qsize())
+        await site.stop()
+        await pool.drain(config.drain_timeout)
+        await runner.cleanup()
+        await dp.emit_shutdown(**workflow_data)
@@ -0,0 +1,49 @@
+import asyncio
+import json
+import zlib
+
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from app.compression import StreamingGZipMiddleware
+
+
+async def records(request):
+    async def body():
+        for index in range(50):
+            yield json.dumps({"row": index, "name": "Ivan Petrov", "email": "ivan@example.com"}) + "\n"
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+def test_streamed_chunks_are_flushed():
+    app = StreamingGZipMiddleware(Starlette(routes=[Route("/export", records)]), minimum_size=100)
+    messages = []
+    
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        messages.append(message)
+    
+    scope = {
+        "type": "http", "method": "GET", "path": "/export", "raw_path": b"/export", "root_path": "",
+        "query_string": b"", "headers": [(b"accept-encoding", b"gzip")], "scheme": "http",
+        "server": ("test", 80), "client": ("test", 1), "http_version": "1.1", "asgi": {"version": "3.0"}
+    }
+    asyncio.run(app(scope, receive, send))
+    
+    assert dict(messages[0]["headers"])[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    rows = []
+    for message in messages[1:]:
+        text = decoder.decompress(message.get("body", b"")).decode()
+        if message.get("more_body"):
+            assert text.endswith("\n")
+        rows.extend(json.loads(line)["row"] for line in text.splitlines())
+    assert rows == list(range(50))
@@ -0,0 +1,31 @@
+import asyncio
+import os
+
+import httpx
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from app.config import settings
+from app.services.ratelimit import TokenBucket
+from app.services.retailcrm import RetailCRMService
+
+
+def test_probe_is_not_queued_behind_saturated_limiter():
+    service = RetailCRMService()
+    service.rate_limiter = TokenBucket(rate=0.01, burst=1)
+    service.rate_limiter._tokens = 0.0
+    service.concurrency.in_flight = int(service.concurrency.limit)
+    
+    async def run():
+        service._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"success": True}))
+        )
+        try:
+            return await asyncio.wait_for(service._run_probe(), settings.health_probe_timeout)
+        finally:
+            await service._client.aclose()
+    
+    probe = asyncio.run(run())
+    assert probe["ok"]
+    assert service.concurrency.in_flight == int(service.concurrency.limit)
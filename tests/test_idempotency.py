@@ -0,0 +1,64 @@
+import asyncio
+import os
+
+import httpx
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from app.services.retailcrm import RetailCRMService
+
+
+def service_with(existing):
+    service = RetailCRMService()
+    
+    async def make_request(method, endpoint, params=None, **kwargs):
+        if method == "POST":
+            return {"success": False, "errorMsg": "HTTP 400: externalId already exists"}
+        ids = params["filter[externalIds][]"]
+        return {"success": True, "customers": [c for c in existing if c["externalId"] in ids]}
+    
+    service._make_request = make_request
+    return service
+
+
+def test_retried_create_returns_existing_customer():
+    service = service_with([{"id": 7, "externalId": "key-1", "firstName": "Ivan", "email": "ivan@example.com"}])
+    result = asyncio.run(service.create_customer({"firstName": "Ivan", "email": "ivan@example.com"}, idempotency_key="key-1"))
+    assert result == {"success": True, "id": 7}
+
+
+def test_reused_key_for_different_customer_is_rejected():
+    service = service_with([{"id": 7, "externalId": "key-1", "firstName": "Ivan"}])
+    result = asyncio.run(service.create_customer({"firstName": "Petr"}, idempotency_key="key-1"))
+    assert not result["success"]
+    assert "already used" in result["errorMsg"]
+
+
+def test_failed_create_without_existing_entity_keeps_error():
+    service = service_with([])
+    result = asyncio.run(service.create_customer({"firstName": "Ivan"}, idempotency_key="key-1"))
+    assert result["errorMsg"].startswith("HTTP 400")
+
+
+def test_payment_lookup_uses_fixed_metric_label(monkeypatch):
+    service = RetailCRMService()
+    labels = []
+    
+    async def send_with_retries(method, url, retryable, consume=None, **kwargs):
+        if method == "POST":
+            return httpx.Response(400, json={"success": False, "errorMsg": "duplicate"})
+        return httpx.Response(200, json={"success": True, "order": {"id": 7, "payments": {"9": {"id": 9, "externalId": "key-1", "amount": 100}}}})
+    
+    monkeypatch.setattr(service, "_send_with_retries", send_with_retries)
+    monkeypatch.setattr(service, "_record_response", lambda method, endpoint, *args: labels.append(endpoint))
+    result = asyncio.run(service.create_payment(7, {"amount": 100}, idempotency_key="key-1"))
+    assert result == {"success": True, "id": 9}
+    assert labels == ["orders/payments/create", "orders/get"]
+
+
+def test_create_does_not_modify_caller_data():
+    service = service_with([])
+    customer = {"firstName": "Ivan"}
+    asyncio.run(service.create_customer(customer, idempotency_key="key-1"))
+    assert customer == {"firstName": "Ivan"}
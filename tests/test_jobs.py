@@ -0,0 +1,42 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from app.config import settings
+from app.services.jobs import FAILED, RUNNING, SUCCEEDED, Job, JobManager, JobStore
+
+
+def finished(status: str, age: timedelta) -> Job:
+    job = Job(kind="customers_export", status=status)
+    job.finished_at = (datetime.now(timezone.utc) - age).isoformat()
+    return job
+
+
+def test_sweep_removes_expired_jobs_and_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "jobs_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "jobs_retention", 3600.0)
+    
+    manager = JobManager()
+    manager._store = JobStore(str(tmp_path / "jobs.db"))
+    manager._store.open()
+    
+    old = finished(SUCCEEDED, timedelta(hours=2))
+    old_failed = finished(FAILED, timedelta(hours=2))
+    recent = finished(SUCCEEDED, timedelta(minutes=5))
+    running = Job(kind="customers_export", status=RUNNING)
+    for job in (old, old_failed, recent, running):
+        manager.jobs[job.id] = job
+        manager._store.save(job)
+    for path in (old.result_path, old_failed.input_path, recent.result_path):
+        open(path, "w").close()
+    
+    assert asyncio.run(manager.sweep()) == 2
+    assert set(manager.jobs) == {recent.id, running.id}
+    assert not os.path.exists(old.result_path)
+    assert not os.path.exists(old_failed.input_path)
+    assert os.path.exists(recent.result_path)
+    assert {job.id for job in manager._store.load()} == {recent.id, running.id}
+    manager._store.close()
@@ -0,0 +1,23 @@
+import os
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from prometheus_client import CollectorRegistry, generate_latest
+
+from app.services.metrics import RetailCRMCollector
+from app.services.retailcrm import RetailCRMService
+
+
+def test_cache_lookups_are_exported_as_counters():
+    service = RetailCRMService()
+    service.cache.set("customers", {"success": True})
+    service.cache.get("customers")
+    service.cache.get("orders")
+    registry = CollectorRegistry()
+    registry.register(RetailCRMCollector(service))
+    
+    output = generate_latest(registry).decode()
+    assert "# TYPE retailcrm_cache_lookups_total counter" in output
+    assert 'retailcrm_cache_lookups_total{result="hit"} 1.0' in output
+    assert 'retailcrm_cache_lookups_total{result="miss"} 1.0' in output
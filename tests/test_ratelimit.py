@@ -0,0 +1,32 @@
+import asyncio
+
+from app.services.ratelimit import AdaptiveConcurrencyLimiter
+
+
+def test_overload_burst_backs_off_once_per_generation():
+    limiter = AdaptiveConcurrencyLimiter(initial=16, minimum=1, maximum=32)
+    
+    async def run():
+        burst = [await limiter.acquire() for _ in range(8)]
+        for generation in burst:
+            await limiter.release(generation, overloaded=True)
+        assert limiter.limit == 8
+        
+        generation = await limiter.acquire()
+        await limiter.release(generation, overloaded=True)
+        assert limiter.limit == 4
+    
+    asyncio.run(run())
+
+
+def test_failures_do_not_grow_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=4, minimum=1, maximum=32)
+    
+    async def run():
+        await limiter.release(await limiter.acquire(), succeeded=False)
+        assert limiter.limit == 4
+        await limiter.release(await limiter.acquire())
+        assert limiter.limit == 4.25
+        assert limiter.in_flight == 0
+    
+    asyncio.run(run())
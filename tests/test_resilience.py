@@ -0,0 +1,114 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from app.services.resilience import CircuitBreaker
+from app.services.retailcrm import RetailCRMService
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at -= breaker.reset_timeout
+
+
+def test_cancelled_half_open_trial_releases_slot():
+    service = RetailCRMService()
+    started = asyncio.Event()
+    
+    async def slow_send(method, url, consume=None, **kwargs):
+        started.set()
+        await asyncio.sleep(60)
+    
+    service._send = slow_send
+    open_breaker(service.breaker)
+    
+    async def run():
+        task = asyncio.create_task(service._send_with_retries("GET", "https://example.retailcrm.ru/api/v5/customers", True))
+        await started.wait()
+        assert service.breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(run())
+    assert service.breaker.allow()
+
+
+def test_stale_half_open_trial_is_readmitted():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker._trial_at -= breaker.reset_timeout
+    assert breaker.allow()
+
+
+def test_half_open_trial_success_closes_breaker():
+    service = RetailCRMService()
+    
+    async def send(method, url, consume=None, **kwargs):
+        return httpx.Response(200, json={"success": True})
+    
+    service._send = send
+    open_breaker(service.breaker)
+    response = asyncio.run(service._send_with_retries("GET", "https://example.retailcrm.ru/api/v5/customers", True))
+    assert response.status_code == 200
+    assert service.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_responses_do_not_open_breaker(monkeypatch):
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+    service = RetailCRMService()
+    
+    async def send(method, url, consume=None, **kwargs):
+        return httpx.Response(429, headers={"Retry-After": "1"})
+    
+    service._send = send
+    for _ in range(service.breaker.failure_threshold):
+        response = asyncio.run(service._send_with_retries("GET", "https://example.retailcrm.ru/api/v5/customers", True))
+        assert response.status_code == 429
+    assert service.breaker.state == CircuitBreaker.CLOSED
+    assert service.breaker.failures == 0
+
+
+def test_streamed_body_errors_are_retried_inside_the_slot(monkeypatch):
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+    service = RetailCRMService()
+    attempts = []
+    in_flight = []
+    
+    class Body(httpx.AsyncByteStream):
+        def __init__(self, broken):
+            self.broken = broken
+        
+        async def __aiter__(self):
+            yield b'{"success": true, "customers": [{"id": 1},'
+            in_flight.append(service.concurrency.in_flight)
+            if self.broken:
+                raise httpx.ReadError("connection reset")
+            yield b' {"id": 2}]}'
+    
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(200, stream=Body(broken=len(attempts) == 1))
+    
+    async def run():
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await service._make_request("GET", "customers", stream_key="customers")
+        finally:
+            await service._client.aclose()
+    
+    result = asyncio.run(run())
+    assert [customer["id"] for customer in result["customers"]] == [1, 2]
+    assert len(attempts) == 2
+    assert in_flight == [1, 1]
+    assert service.concurrency.in_flight == 0
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import time
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from app.services.changes import change_log
+from app.services.retailcrm import retailcrm_service
+from app.services.search import CustomerSearchIndex, SearchIndexer
+
+
+def test_created_customer_becomes_searchable(monkeypatch):
+    created = {"id": 42, "firstName": "Svetlana", "lastName": "Orlova", "email": "orlova@example.com"}
+    
+    async def make_request(method, endpoint, params=None, **kwargs):
+        if method == "POST":
+            return {"success": True, "id": created["id"]}
+        assert params["filter[ids][]"] == [created["id"]]
+        return {"success": True, "customers": [created]}
+    
+    monkeypatch.setattr(retailcrm_service, "_make_request", make_request)
+    indexer = SearchIndexer()
+    indexer.index = CustomerSearchIndex()
+    indexer._seq = change_log.last_seq
+    indexer._rebuilt_at = time.monotonic()
+    
+    async def run():
+        await change_log.start()
+        try:
+            result = await retailcrm_service.create_customer({"firstName": "Svetlana", "lastName": "Orlova"})
+            assert result["success"]
+            await change_log.flush()
+            await indexer.refresh()
+        finally:
+            await change_log.stop()
+    
+    asyncio.run(run())
+    assert [customer["id"] for _, customer in indexer.search("orlova")] == [42]
+
+
+def test_equal_scores_are_ranked_by_id():
+    index = CustomerSearchIndex()
+    for customer_id in (17, 3, 42, 8, 25, 1, 30):
+        index.add({"id": customer_id, "first_name": "Ivan", "last_name": f"Petrov{customer_id}"})
+    index.add({"id": 5, "first_name": "Ivanna", "last_name": "Sidorova"})
+    assert [customer["id"] for _, customer in index.search("ivan", 4)] == [1, 3, 8, 17]
+    assert [customer["id"] for _, customer in index.search("iva", 3)] == [1, 3, 8]
@@ -0,0 +1,24 @@
+import io
+import json
+import os
+
+os.environ.setdefault("RETAILCRM_URL", "https://example.retailcrm.ru")
+os.environ.setdefault("RETAILCRM_API_KEY", "test")
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+from app.tracing import _json_line
+
+
+def test_file_exporter_writes_one_span_per_line():
+    output = io.StringIO()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(out=output, formatter=_json_line)))
+    tracer = provider.get_tracer(__name__)
+    with tracer.start_as_current_span("request"):
+        with tracer.start_as_current_span("retailcrm"):
+            pass
+    
+    lines = output.getvalue().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["retailcrm", "request"]